@@ -0,0 +1,368 @@
+"""
+Benchmarks for radial_build_tools, run with:
+
+    python benchmarks/benchmark_radial_build_tools.py
+
+Times plotting, parastell extraction and OpenMC model construction on
+synthetic builds of increasing size, and records the peak memory allocated
+by each. Also checks that the plotting path starts without importing
+OpenMC. Results are written to a JSON file, which can be passed to a later
+run with --compare to report regressions.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from radial_build_tools import RadialBuildPlot  # noqa: E402
+
+LAYER_COUNTS = [10, 50, 100, 500]
+GRID_SIZES = [10, 100, 500]
+LIBRARY_SIZES = [10, 100, 1000]
+
+
+def make_build(num_layers, material_names=None):
+    """Synthetic radial build dict with num_layers layers"""
+    build = {}
+    for i in range(num_layers):
+        build[f"layer_{i}"] = {
+            "thickness": 1.0 + i % 7,
+            "composition": {"SS316L": 0.6, "HeT410P80": 0.4},
+            "description": f"synthetic layer {i}",
+        }
+        if material_names is not None:
+            build[f"layer_{i}"]["material_name"] = material_names[
+                i % len(material_names)
+            ]
+
+    return build
+
+
+def make_parastell_build(grid_size, num_layers=14):
+    """Synthetic parastell build dict on a grid_size x grid_size grid"""
+    phi_list = np.linspace(0, 90, grid_size)
+    theta_list = np.linspace(0, 360, grid_size)
+    phi, theta = np.meshgrid(phi_list, theta_list, indexing="ij")
+    radial_build = {
+        f"layer_{i}": {
+            "thickness_matrix": 5
+            + np.sin(np.radians(theta + 10 * i))
+            + np.cos(np.radians(4 * phi)),
+            "h5m_tag": f"tag_{i}",
+        }
+        for i in range(num_layers)
+    }
+
+    return {
+        "phi_list": phi_list,
+        "theta_list": theta_list,
+        "radial_build": radial_build,
+    }
+
+
+def make_material_library(num_materials):
+    """Synthetic OpenMC material library with num_materials materials"""
+    import openmc
+
+    materials = openmc.Materials()
+    for i in range(num_materials):
+        mat = openmc.Material(name=f"mat_{i}")
+        mat.add_element("Fe", 1.0)
+        mat.set_density("g/cm3", 7.8)
+        materials.append(mat)
+
+    return materials
+
+
+def measure(func, repeat):
+    """
+    Time func and record the peak memory it allocates.
+
+    Returns:
+        times (list of float): seconds taken by each call
+        peak_memory (int): peak bytes allocated during a single call
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return times, peak_memory
+
+
+def plot_size(num_layers):
+    """Figure size wide enough for the layers of a synthetic build"""
+    return (min(0.4 * num_layers, 40), 4)
+
+
+def bench_plot_radial_build(num_layers):
+    rbp = RadialBuildPlot(make_build(num_layers), size=plot_size(num_layers))
+    return rbp.plot_radial_build
+
+
+def bench_to_png(num_layers, output_dir):
+    rbp = RadialBuildPlot(make_build(num_layers), size=plot_size(num_layers))
+    rbp.plot_radial_build()
+    filename = os.path.join(output_dir, f"benchmark_{num_layers}")
+    return lambda: rbp.to_png(filename)
+
+
+def bench_from_parastell_build(grid_size):
+    parastell_build = make_parastell_build(grid_size)
+    rng = np.random.default_rng(0)
+    phi, theta = rng.uniform(0, 90), rng.uniform(0, 360)
+    return lambda: RadialBuildPlot.from_parastell_build(
+        parastell_build, phi, theta, interpolate=True
+    )
+
+
+def bench_assign_materials(library_size, num_layers=100):
+    # imported here so plot only runs work without OpenMC
+    from radial_build_tools import ToroidalModel
+
+    materials = make_material_library(library_size)
+    names = [mat.name for mat in materials]
+    toroidal_model = ToroidalModel(
+        make_build(num_layers, names), 800, 300, 100, materials
+    )
+    return toroidal_model.assign_materials
+
+
+def bench_get_openmc_model(num_layers):
+    from radial_build_tools import ToroidalModel
+
+    materials = make_material_library(10)
+    names = [mat.name for mat in materials]
+    toroidal_model = ToroidalModel(
+        make_build(num_layers, names), 800, 300, 100, materials
+    )
+    return toroidal_model.get_openmc_model
+
+
+# imports the plotting path in a fresh interpreter and reports the time
+# taken and whether OpenMC was imported
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from radial_build_tools import RadialBuildPlot, read_yaml
+elapsed = time.perf_counter() - start
+print(json.dumps({"time": elapsed, "openmc": "openmc" in sys.modules}))
+"""
+
+
+def measure_startup(repeat):
+    """
+    Time importing the plotting path in fresh interpreters.
+
+    Returns:
+        times (list of float): seconds taken by each import
+        openmc_imported (bool): True if OpenMC was imported
+    """
+    package_dir = os.path.join(os.path.dirname(__file__), "..")
+    times = []
+    openmc_imported = False
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", STARTUP_SCRIPT],
+            cwd=package_dir,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        startup = json.loads(output)
+        times.append(startup["time"])
+        openmc_imported |= startup["openmc"]
+
+    return times, openmc_imported
+
+
+def get_benchmarks(args):
+    """Benchmark cases as (name, params, setup function)"""
+    benchmarks = []
+    for num_layers in args.layers:
+        params = {"num_layers": num_layers}
+        benchmarks += [
+            (
+                "plot_radial_build",
+                params,
+                lambda n=num_layers: bench_plot_radial_build(n),
+            ),
+            (
+                "to_png",
+                params,
+                lambda n=num_layers: bench_to_png(n, args.output_dir),
+            ),
+        ]
+    for grid_size in args.grids:
+        benchmarks.append(
+            (
+                "from_parastell_build",
+                {"grid_size": grid_size},
+                lambda n=grid_size: bench_from_parastell_build(n),
+            )
+        )
+    if not args.skip_openmc:
+        for library_size in args.libraries:
+            benchmarks.append(
+                (
+                    "assign_materials",
+                    {"library_size": library_size},
+                    lambda n=library_size: bench_assign_materials(n),
+                )
+            )
+        for num_layers in args.layers:
+            benchmarks.append(
+                (
+                    "get_openmc_model",
+                    {"num_layers": num_layers},
+                    lambda n=num_layers: bench_get_openmc_model(n),
+                )
+            )
+
+    return benchmarks
+
+
+def compare(results, baseline_file, threshold):
+    """
+    Compare results to a baseline results file.
+
+    Returns:
+        regressions (list of str): descriptions of benchmarks whose minimum
+            time or peak memory grew by more than threshold
+    """
+    with open(baseline_file) as file:
+        baseline = json.load(file)
+
+    baseline_results = {
+        (result["name"], json.dumps(result["params"], sort_keys=True)): result
+        for result in baseline["results"]
+    }
+
+    regressions = []
+    for result in results:
+        key = (result["name"], json.dumps(result["params"], sort_keys=True))
+        if key not in baseline_results:
+            continue
+        for metric in ("min_time", "peak_memory"):
+            old = baseline_results[key][metric]
+            new = result[metric]
+            if old > 0 and new / old > threshold:
+                regressions.append(
+                    f"{result['name']} {result['params']}: {metric} "
+                    f"{old:.4g} -> {new:.4g} ({new / old:.2f}x)"
+                )
+
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog="benchmark_radial_build_tools")
+
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="benchmark_results.json",
+        help="JSON file to write results to",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=".",
+        help="directory for files written by the benchmarks",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--layers", type=int, nargs="+", default=LAYER_COUNTS)
+    parser.add_argument("--grids", type=int, nargs="+", default=GRID_SIZES)
+    parser.add_argument(
+        "--libraries", type=int, nargs="+", default=LIBRARY_SIZES
+    )
+    parser.add_argument(
+        "--skip-openmc",
+        action="store_true",
+        help="skip the OpenMC model benchmarks",
+    )
+    parser.add_argument(
+        "--compare", help="results file to compare against for regressions"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="ratio to the compared results counted as a regression",
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    startup_times, openmc_imported = measure_startup(args.repeat)
+    results = [
+        {
+            "name": "plotting_import",
+            "params": {},
+            "min_time": min(startup_times),
+            "mean_time": float(np.mean(startup_times)),
+            "peak_memory": 0,
+        }
+    ]
+    print(f"{'plotting_import':<48}min {min(startup_times):10.4f} s")
+    if openmc_imported:
+        print("regression: importing the plotting path imported openmc")
+
+    for name, params, setup in get_benchmarks(args):
+        times, peak_memory = measure(setup(), args.repeat)
+        result = {
+            "name": name,
+            "params": params,
+            "min_time": min(times),
+            "mean_time": float(np.mean(times)),
+            "peak_memory": peak_memory,
+        }
+        results.append(result)
+        print(
+            f"{name:<22}{str(params):<26}min {result['min_time']:10.4f} s  "
+            f"peak {peak_memory / 1e6:10.2f} MB"
+        )
+
+    with open(args.output, "w") as file:
+        json.dump(
+            {
+                "metadata": {
+                    "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "python": platform.python_version(),
+                    "numpy": np.__version__,
+                    "repeat": args.repeat,
+                },
+                "results": results,
+            },
+            file,
+            indent=2,
+        )
+
+    regressions = []
+    if args.compare is not None:
+        regressions = compare(results, args.compare, args.threshold)
+        for regression in regressions:
+            print(f"regression: {regression}")
+    if regressions or openmc_imported:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Tools for building, manipulating and representing radial builds for fusion
+power systems.
+
+Submodules are imported on first use of their contents, so plotting does
+not import OpenMC, and building OpenMC models does not import matplotlib.
+Star imports leave out the names that need OpenMC, such as ToroidalModel,
+which are imported by name instead.
+"""
+
+import importlib
+
+# public name mapped to the submodule defining it
+_exports = {
+    "RadialBuild": "build",
+    "RadialBuildPlot": "plotting",
+    "RadialBuildFigure": "plotting",
+    "render_radial_builds": "plotting",
+    "render_multipage_pdf": "plotting",
+    "plot_parastell_summary": "plotting",
+    "layer_string_cache_info": "plotting",
+    "clear_layer_string_cache": "plotting",
+    "RenderCache": "render_cache",
+    "Profiler": "profiling",
+    "sample_parastell_build": "parastell",
+    "stack_parastell_build": "parastell",
+    "read_parastell_build": "parastell",
+    "write_parastell_build": "parastell",
+    "find_thickness_extremes": "parastell",
+    "ToroidalModel": "toroidal",
+    "parameter_grid": "toroidal",
+    "export_sweep": "toroidal",
+    "index_materials": "toroidal",
+    "load_material_library": "toroidal",
+    "format_complexity_report": "toroidal",
+    "read_yaml": "serialization",
+    "write_yaml": "serialization",
+    "read_json": "serialization",
+    "write_json": "serialization",
+    "read_build_file": "serialization",
+    "main": "cli",
+}
+
+# modules that import OpenMC, whose names are left out of __all__ so that
+# star imports work without OpenMC installed
+_openmc_modules = ("toroidal",)
+
+__all__ = [
+    name for name, module in _exports.items() if module not in _openmc_modules
+]
+
+
+def __getattr__(name):
+    if name in _exports:
+        module = importlib.import_module(f".{_exports[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_exports))
@@ -0,0 +1,465 @@
+import numpy as np
+
+
+def _read_only(array):
+    array = np.array(array, dtype=float)
+    array.flags.writeable = False
+    return array
+
+
+def _torus_offsets(points, major_rad, minor_rad_z, minor_rad_xy, rtol):
+    """
+    Find the offset t added to both minor radii of a ZTorus for its surface
+    to pass through each point, solving
+
+        z**2 / (minor_rad_z + t)**2 + d**2 / (minor_rad_xy + t)**2 = 1
+
+    where d is the distance of the point from the major radius in its
+    poloidal plane. The left hand side is convex and decreasing for t >= 0,
+    so Newton iterations started left of the root increase monotonically to
+    it. Points inside the torus with t = 0 get an offset of -1.
+    """
+    z_sq = points[:, 2] ** 2
+    d_sq = (np.hypot(points[:, 0], points[:, 1]) - major_rad) ** 2
+
+    offsets = np.full(len(points), -1.0)
+    # indices of the points whose offset is still being solved for
+    pending = np.flatnonzero(
+        z_sq / minor_rad_z**2 + d_sq / minor_rad_xy**2 >= 1
+    )
+    z_sq = z_sq[pending]
+    d_sq = d_sq[pending]
+    # the root is at least the offset of the circle with the larger minor
+    # radius passing through the point
+    guess = np.maximum(
+        np.sqrt(z_sq + d_sq) - max(minor_rad_z, minor_rad_xy), 0.0
+    )
+    tolerance = rtol * max(minor_rad_z, minor_rad_xy)
+
+    # converges in a handful of iterations, the limit only guards against
+    # round-off keeping steps above the tolerance
+    for _ in range(100):
+        if not pending.size:
+            break
+        b_z = minor_rad_z + guess
+        b_xy = minor_rad_xy + guess
+        value = z_sq / b_z**2 + d_sq / b_xy**2 - 1
+        slope = -2 * (z_sq / b_z**3 + d_sq / b_xy**3)
+        step = -value / slope
+        guess += step
+
+        converged = step <= tolerance
+        offsets[pending[converged]] = guess[converged]
+        pending = pending[~converged]
+        z_sq = z_sq[~converged]
+        d_sq = d_sq[~converged]
+        guess = guess[~converged]
+    offsets[pending] = guess
+
+    return offsets
+
+
+def _torus_volume(
+    major_rad, minor_rad_z, minor_rad_xy, theta_range=None, phi_span=360.0
+):
+    """
+    Volume inside a ZTorus, or inside the part of it within a poloidal wedge
+    and a toroidal span. The volume is integrated in closed form in polar
+    coordinates about the plasma center (major_rad, 0) of the r-z plane.
+    Minor radii may be arrays, to get the volumes of many tori at once.
+    Tori whose minor radius perpendicular to z reaches the z axis only
+    enclose the part of their cross section at r >= 0, which has a closed
+    form over the whole cross section but not over a wedge.
+
+    Arguments:
+        major_rad (float): major radius of the torus
+        minor_rad_z (float or numpy array): minor radius parallel to z
+        minor_rad_xy (float or numpy array): minor radius perpendicular to z
+        theta_range (tuple of float): Optional, (start, stop) poloidal
+            angles of the wedge, in degrees, measured from the outboard
+            midplane towards +z. If None, the whole poloidal cross section
+        phi_span (float): Optional, toroidal angle spanned, in degrees
+
+    Returns:
+        volume (float or numpy array): volume of each torus, NaN for wedges
+            of tori reaching the z axis
+    """
+    minor_rad_z = np.asarray(minor_rad_z, dtype=float)
+    minor_rad_xy = np.asarray(minor_rad_xy, dtype=float)
+    # distance from the plasma center to the z axis, in units of
+    # minor_rad_xy, 1 if the cross section does not reach the axis
+    axis = np.minimum(major_rad / minor_rad_xy, 1.0)
+
+    if theta_range is None:
+        # Pappus's centroid theorem per radian of toroidal angle, with the
+        # area and first moment of the unit disk clipped at u >= -axis
+        area = np.pi / 2 + axis * np.sqrt(1 - axis**2) + np.arcsin(axis)
+        moment = 2 / 3 * (1 - axis**2) ** 1.5
+        poloidal_volume = (
+            minor_rad_z
+            * minor_rad_xy
+            * (major_rad * area + minor_rad_xy * moment)
+        )
+    else:
+        start, stop = np.radians(theta_range)
+
+        def area_angle(theta):
+            # antiderivative of rho(theta)**2, unwrapped to stay continuous
+            turns = np.round(
+                (theta - np.arctan2(np.sin(theta), np.cos(theta)))
+                / (2 * np.pi)
+            )
+            return (
+                minor_rad_z
+                * minor_rad_xy
+                * (
+                    np.arctan2(
+                        minor_rad_xy * np.sin(theta),
+                        minor_rad_z * np.cos(theta),
+                    )
+                    + 2 * np.pi * turns
+                )
+            )
+
+        def radial_moment(theta):
+            # antiderivative of rho(theta)**3 * cos(theta)
+            sin_theta = np.sin(theta)
+            xy_term = minor_rad_xy**-2
+            z_term = minor_rad_z**-2 - xy_term
+            return sin_theta / (
+                xy_term * np.sqrt(xy_term + z_term * sin_theta**2)
+            )
+
+        poloidal_volume = np.where(
+            axis < 1,
+            np.nan,
+            major_rad * (area_angle(stop) - area_angle(start)) / 2
+            + (radial_moment(stop) - radial_moment(start)) / 3,
+        )
+
+    return poloidal_volume * np.radians(phi_span)
+
+
+class RadialBuild(object):
+    """
+    Immutable, array-backed radial build, storing each layer entry as one
+    column over the layers instead of as a dict per layer. Thicknesses are a
+    float64 array, so cumulative radii, zero thickness filtering and the total
+    thickness are vectorized. Instances can be shared between many
+    RadialBuildPlot and ToroidalModel objects, which never modify them.
+
+    Parameters
+        names (iter of str): layer names, in build order
+        thicknesses (iter of float): thickness of each layer, NaN for layers
+            without a thickness
+        material_names (iter of str): Optional, name of the material of each
+            layer in a material library, None for void layers
+        compositions (iter of dict): Optional, composition of each layer,
+            mapping material names to fractions, or None. Stored as tuples
+            of (material name, fraction) pairs.
+        descriptions (iter of str): Optional, description of each layer, or
+            None
+        thickness_matrices (iter of numpy array): Optional, thickness matrix
+            of each layer on a phi, theta grid, or None
+    """
+
+    __slots__ = (
+        "names",
+        "thicknesses",
+        "radii",
+        "material_names",
+        "compositions",
+        "descriptions",
+        "thickness_matrices",
+    )
+
+    def __init__(
+        self,
+        names,
+        thicknesses,
+        material_names=None,
+        compositions=None,
+        descriptions=None,
+        thickness_matrices=None,
+    ):
+        names = tuple(names)
+        num_layers = len(names)
+        thicknesses = _read_only(thicknesses)
+        if thicknesses.shape != (num_layers,):
+            raise ValueError(
+                f"{num_layers} layer names were given with "
+                f"{thicknesses.size} thicknesses"
+            )
+
+        def column(values):
+            if values is None:
+                return (None,) * num_layers
+            values = tuple(values)
+            if len(values) != num_layers:
+                raise ValueError(
+                    f"{num_layers} layer names were given with "
+                    f"{len(values)} layer entries"
+                )
+            return values
+
+        set_slot = object.__setattr__
+        set_slot(self, "names", names)
+        set_slot(self, "thicknesses", thicknesses)
+        # outer radius of each layer, relative to the inner radius of the
+        # first layer. Layers without a thickness add nothing.
+        set_slot(self, "radii", _read_only(np.nancumsum(thicknesses)))
+        set_slot(self, "material_names", column(material_names))
+        set_slot(
+            self,
+            "compositions",
+            tuple(
+                (
+                    None
+                    if composition is None
+                    else tuple(dict(composition).items())
+                )
+                for composition in column(compositions)
+            ),
+        )
+        set_slot(self, "descriptions", column(descriptions))
+        set_slot(
+            self,
+            "thickness_matrices",
+            tuple(
+                None if matrix is None else _read_only(matrix)
+                for matrix in column(thickness_matrices)
+            ),
+        )
+
+    @classmethod
+    def _from_columns(
+        cls,
+        names,
+        thicknesses,
+        radii,
+        material_names,
+        compositions,
+        descriptions,
+        thickness_matrices,
+    ):
+        """
+        Create a radial build from columns in the stored format, without
+        validating or copying them, so thicknesses and radii can be read-only
+        views into larger arrays, see RadialBuildPlot.from_parastell_sweep.
+        """
+        radial_build = object.__new__(cls)
+        for slot, value in zip(
+            cls.__slots__,
+            (
+                names,
+                thicknesses,
+                radii,
+                material_names,
+                compositions,
+                descriptions,
+                thickness_matrices,
+            ),
+        ):
+            object.__setattr__(radial_build, slot, value)
+
+        return radial_build
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return (
+            type(self),
+            (
+                self.names,
+                self.thicknesses,
+                self.material_names,
+                self.compositions,
+                self.descriptions,
+                self.thickness_matrices,
+            ),
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}({len(self)} layers, total thickness "
+            f"{self.total_thickness})"
+        )
+
+    @property
+    def nonzero(self):
+        """Boolean mask of layers without zero thickness"""
+        return self.thicknesses != 0
+
+    @property
+    def total_thickness(self):
+        """Sum of the layer thicknesses"""
+        return float(self.radii[-1]) if len(self) else 0.0
+
+    @property
+    def sectorized(self):
+        """True if any layer has a thickness matrix"""
+        return any(matrix is not None for matrix in self.thickness_matrices)
+
+    @classmethod
+    def from_dict(cls, build):
+        """
+        Create a radial build from the dict format used by RadialBuildPlot
+        and ToroidalModel. Only the "thickness", "material_name",
+        "composition", "description" and "thickness_matrix" entries of each
+        layer are kept.
+
+        Arguments:
+            build (dict): layer name mapped to a dict of layer entries
+
+        Returns:
+            radial_build (RadialBuild): radial build with the same layers
+        """
+        layers = build.values()
+
+        return cls(
+            build.keys(),
+            [layer.get("thickness", np.nan) for layer in layers],
+            [layer.get("material_name") for layer in layers],
+            [layer.get("composition") for layer in layers],
+            [layer.get("description") for layer in layers],
+            [layer.get("thickness_matrix") for layer in layers],
+        )
+
+    def to_dict(self):
+        """
+        Convert to the dict format used by RadialBuildPlot and ToroidalModel.
+        Entries that are not set for a layer are left out of its dict.
+
+        Returns:
+            build (dict): layer name mapped to a new dict of layer entries
+        """
+        build = {}
+        for index, name in enumerate(self.names):
+            thickness = float(self.thicknesses[index])
+            matrix = self.thickness_matrices[index]
+            composition = self.compositions[index]
+            description = self.descriptions[index]
+            material_name = self.material_names[index]
+
+            layer = {}
+            if not np.isnan(thickness):
+                layer["thickness"] = thickness
+            if matrix is not None:
+                layer["thickness_matrix"] = matrix
+            if composition is not None:
+                layer["composition"] = dict(composition)
+            if description is not None:
+                layer["description"] = description
+            if material_name is not None:
+                layer["material_name"] = material_name
+            build[name] = layer
+
+        return build
+
+    def classify_points(
+        self, points, major_rad, minor_rad_z, minor_rad_xy, rtol=1e-12
+    ):
+        """
+        Find the layer containing each point in the toroidal geometry built
+        by ToroidalModel from this build, without building the OpenMC
+        geometry. Layers are nested ZTorus shells, so each point's offset
+        from the plasma surface is solved for in closed form, then located
+        among the cumulative layer radii with np.searchsorted.
+
+        Arguments:
+            points (numpy array): (N, 3) array of x, y, z coordinates
+            major_rad, minor_rad_z, minor_rad_xy (float): radii of the
+                plasma surface, see ToroidalModel
+            rtol (float): Optional, tolerance of the offset of each point,
+                relative to the larger minor radius
+
+        Returns:
+            layer_indices (numpy array): (N,) array of the index in names
+                of the layer containing each point, -1 for points in the
+                plasma and len(names) for points outside the build
+        """
+        if self.sectorized:
+            raise ValueError(
+                "points can't be classified in builds with thickness "
+                "matrices"
+            )
+        points = np.asarray(points, dtype=float)
+        if points.ndim != 2 or points.shape[1] != 3:
+            raise ValueError(
+                f"points must have shape (N, 3), not {points.shape}"
+            )
+        if not np.isfinite(points).all():
+            raise ValueError("points must be finite")
+
+        offsets = _torus_offsets(
+            points, major_rad, minor_rad_z, minor_rad_xy, rtol
+        )
+
+        nonzero = np.flatnonzero(self.nonzero)
+        # inner radius of the first layer followed by the outer radius of
+        # each nonzero layer
+        bounds = np.concatenate(([0.0], self.radii[nonzero]))
+        # -1 for the plasma, then the nonzero layers, then outside
+        layer_indices = np.concatenate(([-1], nonzero, [len(self)]))
+
+        return layer_indices[np.searchsorted(bounds, offsets)]
+
+    def get_volumes(self, major_rad, minor_rad_z, minor_rad_xy):
+        """
+        Compute the exact volume of each layer of the toroidal geometry built
+        by ToroidalModel from this build, as the difference of the closed
+        form volumes of the ZTorus surfaces bounding it.
+
+        Arguments:
+            major_rad, minor_rad_z, minor_rad_xy (float): radii of the
+                plasma surface, see ToroidalModel
+
+        Returns:
+            volumes (numpy array): volume of each layer, in the units of the
+                radii cubed, 0 for layers with zero thickness
+        """
+        if self.sectorized:
+            raise ValueError(
+                "volumes of builds with thickness matrices depend on the "
+                "sectors, use ToroidalModel.set_volumes"
+            )
+
+        volumes = _torus_volume(
+            major_rad,
+            np.concatenate(([minor_rad_z], minor_rad_z + self.radii)),
+            np.concatenate(([minor_rad_xy], minor_rad_xy + self.radii)),
+        )
+
+        return np.diff(volumes)
+
+    def with_thicknesses(self, thicknesses):
+        """
+        Get a copy of the build with some layer thicknesses replaced.
+
+        Arguments:
+            thicknesses (dict): layer name (str) mapped to its new thickness
+
+        Returns:
+            radial_build (RadialBuild): build with the new thicknesses
+        """
+        unknown = thicknesses.keys() - set(self.names)
+        if unknown:
+            raise ValueError(f"unknown layers {unknown}")
+
+        return type(self)(
+            self.names,
+            [
+                thicknesses.get(name, thickness)
+                for name, thickness in zip(
+                    self.names, self.thicknesses.tolist()
+                )
+            ],
+            self.material_names,
+            self.compositions,
+            self.descriptions,
+            self.thickness_matrices,
+        )
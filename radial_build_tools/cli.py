@@ -0,0 +1,301 @@
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+
+from .plotting import (
+    OUTPUT_FORMATS,
+    RadialBuildPlot,
+    _render_to_file,
+    render_multipage_pdf,
+)
+from .profiling import Profiler, stage
+from .render_cache import RenderCache
+from .serialization import read_build_file
+
+
+def parse_args():
+    """Parser for running as a script"""
+    parser = argparse.ArgumentParser(prog="plot_radial_build")
+
+    parser.add_argument(
+        "filename",
+        nargs="+",
+        help="YAML or JSON file(s), glob pattern(s) or directories of files "
+        "defining radial builds",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=1,
+        help="number of worker processes used to render plots",
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        default=".",
+        help="directory to write plot files to",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="png",
+        help="format of the plot files, svg and pdf are written as vectors",
+    )
+    parser.add_argument(
+        "--dpi",
+        type=float,
+        default=200,
+        help="resolution of png files",
+    )
+    parser.add_argument(
+        "--pdf",
+        help="write every plot as a page of this single pdf file instead of "
+        "one file per plot",
+    )
+    parser.add_argument(
+        "-i",
+        "--incremental",
+        action="store_true",
+        help="skip files whose plot is newer than the YAML or JSON file",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="directory of a cache of rendered plots, unchanged plots are "
+        "copied from the cache instead of being plotted again",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=float,
+        default=500,
+        help="maximum size of the plot cache, MB",
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="remove every plot from the cache before rendering",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="-",
+        metavar="JSON_FILE",
+        help="record the time and calls of each pipeline stage and print a "
+        "table at exit, or write it to JSON_FILE",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="also record the peak memory of each stage with --profile, "
+        "which slows rendering several times",
+    )
+
+    return parser.parse_args()
+
+
+def expand_filenames(patterns):
+    """
+    Expand YAML or JSON file names, glob patterns and directories into a list
+    of files.
+
+    Arguments:
+        patterns (iter of str): file names, glob patterns or directories.
+            Directories are expanded to the .yml, .yaml and .json files they
+            contain
+
+    Returns:
+        filenames (list of str): YAML and JSON files, in the order given,
+            without duplicates
+    """
+    filenames = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(
+                glob.glob(os.path.join(pattern, "*.yml"))
+                + glob.glob(os.path.join(pattern, "*.yaml"))
+                + glob.glob(os.path.join(pattern, "*.json"))
+            )
+        elif glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern))
+        else:
+            matches = [pattern]
+        filenames += [match for match in matches if match not in filenames]
+
+    return filenames
+
+
+def _timed_render_to_file(
+    radial_build, filename, cache, file_format, dpi, profile=None
+):
+    """
+    Render a plot to a file and time it, for use by workers. If profile is
+    not None, a profiler with trace_memory=profile is enabled while
+    rendering and its stats are returned, or None otherwise.
+    """
+    profiler = None if profile is None else Profiler(trace_memory=profile)
+    start = time.perf_counter()
+    with profiler or nullcontext():
+        plot_file = _render_to_file(
+            radial_build, filename, cache, file_format, dpi
+        )
+
+    return (
+        plot_file,
+        time.perf_counter() - start,
+        None if profiler is None else profiler.stats,
+    )
+
+
+def render_files(
+    filenames,
+    output_dir=".",
+    workers=1,
+    incremental=False,
+    cache=None,
+    file_format="png",
+    dpi=200,
+    profiler=None,
+):
+    """
+    Render the radial build plots defined by YAML or JSON files to plot files
+    named after the plot titles.
+
+    Arguments:
+        filenames (iter of str): YAML or JSON files defining radial builds
+        output_dir (str): directory to write plot files to
+        workers (int): number of worker processes. If 1, plots are rendered
+            in the current process.
+        incremental (bool): if True, skip files whose plot file is newer
+            than the file
+        cache (RenderCache): Optional, cache of rendered plots
+        file_format (str): one of "png", "svg" or "pdf"
+        dpi (float): resolution of png files
+        profiler (Profiler): Optional, enabled profiler to add the stats of
+            worker processes to. Rendering in the current process is
+            recorded by the enabled profiler directly.
+
+    Returns:
+        timings (list of tuple): (YAML file, plot file, seconds) for each
+            file, seconds is None for skipped files
+    """
+    timings = []
+    to_render = []
+    for filename in filenames:
+        with stage("read_build_file"):
+            radial_build = RadialBuildPlot(**read_build_file(filename))
+        plot_name = os.path.join(
+            output_dir, radial_build.title.replace(" ", "")
+        )
+        plot_file = f"{plot_name}.{file_format}"
+        timings.append((filename, plot_file, None))
+        if (
+            incremental
+            and os.path.exists(plot_file)
+            and os.path.getmtime(plot_file) > os.path.getmtime(filename)
+        ):
+            continue
+        to_render.append((len(timings) - 1, radial_build, plot_name))
+
+    indices = [index for index, _, _ in to_render]
+    radial_builds = [radial_build for _, radial_build, _ in to_render]
+    plot_names = [plot_name for _, _, plot_name in to_render]
+    render = partial(
+        _timed_render_to_file,
+        cache=cache,
+        file_format=file_format,
+        dpi=dpi,
+        profile=(
+            profiler.trace_memory
+            if profiler is not None and workers != 1
+            else None
+        ),
+    )
+
+    if workers == 1:
+        results = list(map(render, radial_builds, plot_names))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(render, radial_builds, plot_names))
+
+    for index, (plot_file, seconds, stats) in zip(indices, results):
+        timings[index] = (timings[index][0], plot_file, seconds)
+        if stats is not None:
+            profiler.merge(stats)
+
+    return timings
+
+
+def main():
+    args = parse_args()
+    filenames = expand_filenames(args.filename)
+
+    profiler = None
+    if args.profile is not None:
+        profiler = Profiler(trace_memory=args.profile_memory)
+
+    with profiler or nullcontext():
+        render(args, filenames, profiler)
+
+    if profiler is not None:
+        if args.profile == "-":
+            print(profiler.format_report())
+        else:
+            profiler.write_report(args.profile)
+            print(f"wrote profile to {args.profile}")
+
+
+def render(args, filenames, profiler):
+    """Render the files given on the command line and print a summary"""
+    if args.pdf is not None:
+        start = time.perf_counter()
+        num_pages = render_multipage_pdf(
+            (
+                RadialBuildPlot(**read_build_file(filename))
+                for filename in filenames
+            ),
+            args.pdf,
+        )
+        elapsed = time.perf_counter() - start
+        print(f"wrote {num_pages} plots to {args.pdf} in {elapsed:.3f} s")
+        return
+
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    cache = None
+    if args.cache_dir is not None:
+        cache = RenderCache(args.cache_dir, int(args.cache_size * 1e6))
+        if args.clear_cache:
+            cache.clear()
+
+    start = time.perf_counter()
+    timings = render_files(
+        filenames,
+        args.output_dir,
+        args.workers,
+        args.incremental,
+        cache,
+        args.format,
+        args.dpi,
+        profiler,
+    )
+    elapsed = time.perf_counter() - start
+
+    for filename, plot_file, seconds in timings:
+        if seconds is None:
+            print(f"{filename} -> {plot_file}: up to date, skipped")
+        else:
+            print(f"{filename} -> {plot_file}: {seconds:.3f} s")
+    rendered = sum(seconds is not None for _, _, seconds in timings)
+    print(
+        f"rendered {rendered} of {len(timings)} files in {elapsed:.3f} s "
+        f"with {args.workers} workers"
+    )
+
+
+if __name__ == "__main__":
+    main()
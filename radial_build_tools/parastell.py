@@ -0,0 +1,418 @@
+import zipfile
+
+import numpy as np
+
+
+def _locate_angles(angle_list, angles):
+    """
+    Find the grid points bracketing each of the given angles.
+
+    Arguments:
+        angle_list (numpy array): strictly increasing angle grid
+        angles (float or numpy array): angles to locate on the grid
+
+    Returns:
+        lower (numpy array): index of the grid point below each angle
+        upper (numpy array): index of the grid point above each angle
+        weight (numpy array): fractional distance of each angle from the
+            lower grid point to the upper grid point
+    """
+    angle_list = np.asarray(angle_list, dtype=float)
+    angles = np.asarray(angles, dtype=float)
+
+    if np.any(np.diff(angle_list) <= 0):
+        raise ValueError("angle grid must be strictly increasing")
+    if np.any((angles < angle_list[0]) | (angles > angle_list[-1])):
+        raise ValueError(
+            f"angles must be within the grid range [{angle_list[0]}, "
+            f"{angle_list[-1]}]"
+        )
+
+    if angle_list.size == 1:
+        zeros = np.zeros(angles.shape, dtype=int)
+        return zeros, zeros, np.zeros(angles.shape)
+
+    upper = np.clip(
+        np.searchsorted(angle_list, angles), 1, angle_list.size - 1
+    )
+    lower = upper - 1
+    weight = (angles - angle_list[lower]) / (
+        angle_list[upper] - angle_list[lower]
+    )
+
+    return lower, upper, weight
+
+
+def sample_parastell_build(
+    parastell_build_dict, phi, theta, interpolate=False
+):
+    """
+    Look up the thickness of every layer in a parastell build at the given
+    angles. phi and theta may be floats or arrays of query angles, which are
+    broadcast against each other.
+
+    Arguments:
+        parastell_build_dict (dict): parastell build dict, containing
+            "phi_list", "theta_list" and "radial_build"
+        phi (float or numpy array): toroidal angles to sample
+        theta (float or numpy array): poloidal angles to sample
+        interpolate (bool): if True, bilinearly interpolate the layer
+            thicknesses between the neighbouring grid points, otherwise use
+            the nearest grid point, the lower one for angles halfway
+            between two grid points
+
+    Returns:
+        layer_names (list of str): names of the layers, in build order
+        h5m_tags (list of str): material tag of each layer
+        thicknesses (numpy array): layer thicknesses, with shape
+            (n_layers,) + broadcast shape of phi and theta
+    """
+    phi, theta = np.broadcast_arrays(
+        np.asarray(phi, dtype=float), np.asarray(theta, dtype=float)
+    )
+    phi_lower, phi_upper, phi_weight = _locate_angles(
+        parastell_build_dict["phi_list"], phi
+    )
+    theta_lower, theta_upper, theta_weight = _locate_angles(
+        parastell_build_dict["theta_list"], theta
+    )
+
+    if not interpolate:
+        phi_index = np.where(phi_weight > 0.5, phi_upper, phi_lower)
+        theta_index = np.where(theta_weight > 0.5, theta_upper, theta_lower)
+
+    radial_build = parastell_build_dict["radial_build"]
+    layer_names = list(radial_build.keys())
+    h5m_tags = [layer["h5m_tag"] for layer in radial_build.values()]
+    thicknesses = []
+    for layer in radial_build.values():
+        matrix = layer["thickness_matrix"]
+        if not interpolate:
+            thicknesses.append(matrix[phi_index, theta_index])
+            continue
+        thicknesses.append(
+            (1 - phi_weight)
+            * (1 - theta_weight)
+            * matrix[phi_lower, theta_lower]
+            + (1 - phi_weight) * theta_weight * matrix[phi_lower, theta_upper]
+            + phi_weight * (1 - theta_weight) * matrix[phi_upper, theta_lower]
+            + phi_weight * theta_weight * matrix[phi_upper, theta_upper]
+        )
+
+    return layer_names, h5m_tags, np.asarray(thicknesses, dtype=float)
+
+
+def stack_parastell_build(parastell_build_dict):
+    """
+    Stack the thickness matrices of every layer in a parastell build into a
+    single array.
+
+    Arguments:
+        parastell_build_dict (dict): parastell build dict, containing
+            "radial_build"
+
+    Returns:
+        layer_names (list of str): names of the layers, in build order
+        h5m_tags (list of str): material tag of each layer
+        thicknesses (numpy array): layer thicknesses, with shape
+            (n_layers, n_phi, n_theta)
+    """
+    radial_build = parastell_build_dict["radial_build"]
+    layer_names = list(radial_build.keys())
+    h5m_tags = [layer["h5m_tag"] for layer in radial_build.values()]
+    thicknesses = np.stack(
+        [
+            np.asarray(layer["thickness_matrix"], dtype=float)
+            for layer in radial_build.values()
+        ]
+    )
+
+    return layer_names, h5m_tags, thicknesses
+
+
+def find_thickness_extremes(parastell_build_dict):
+    """
+    Find the angles at which the total thickness of a parastell build, summed
+    over every layer, is smallest and largest.
+
+    Arguments:
+        parastell_build_dict (dict): parastell build dict, containing
+            "phi_list", "theta_list" and "radial_build"
+
+    Returns:
+        extremes (dict): "min" and "max" each mapped to a (phi, theta,
+            total thickness) tuple
+    """
+    _, _, thicknesses = stack_parastell_build(parastell_build_dict)
+
+    return _thickness_extremes(
+        thicknesses.sum(axis=0),
+        parastell_build_dict["phi_list"],
+        parastell_build_dict["theta_list"],
+    )
+
+
+def _thickness_extremes(total_thickness, phi_list, theta_list):
+    """
+    Find the angles at which a total thickness matrix is smallest and
+    largest, see find_thickness_extremes.
+
+    Arguments:
+        total_thickness (numpy array): total thickness of the build, with
+            shape (n_phi, n_theta)
+        phi_list, theta_list (iter of float): angles of the matrix grid
+
+    Returns:
+        extremes (dict): "min" and "max" each mapped to a (phi, theta,
+            total thickness) tuple
+    """
+    extremes = {}
+    for name, index in (
+        ("min", total_thickness.argmin()),
+        ("max", total_thickness.argmax()),
+    ):
+        phi_index, theta_index = np.unravel_index(index, total_thickness.shape)
+        extremes[name] = (
+            float(phi_list[phi_index]),
+            float(theta_list[theta_index]),
+            float(total_thickness[phi_index, theta_index]),
+        )
+
+    return extremes
+
+
+class _LazyMatrix(object):
+    """
+    Read-on-demand view of a 2D thickness matrix stored on disk. Indexing
+    with arrays of indices only reads the block of the matrix spanning the
+    requested indices.
+
+    Parameters
+        dataset: sliceable on-disk array, such as an h5py Dataset
+    """
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.shape = dataset.shape
+
+    def __getitem__(self, index):
+        if any(isinstance(axis_index, slice) for axis_index in index):
+            return np.asarray(self.dataset[index])
+
+        phi_index, theta_index = np.broadcast_arrays(
+            *[np.asarray(axis_index, dtype=int) for axis_index in index]
+        )
+        if phi_index.size == 0:
+            return np.empty(phi_index.shape)
+
+        phi_min, theta_min = phi_index.min(), theta_index.min()
+        block = np.asarray(
+            self.dataset[
+                phi_min : phi_index.max() + 1,
+                theta_min : theta_index.max() + 1,
+            ]
+        )
+
+        return block[phi_index - phi_min, theta_index - theta_min]
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.dataset[()], dtype=dtype)
+
+
+class _DeferredNpzArray(object):
+    """
+    Array in a .npz file that is read the first time it is accessed, used
+    for compressed members which can't be memory-mapped.
+
+    Parameters
+        npz_file (NpzFile): open .npz file containing the array
+        key (str): name of the array in the .npz file
+    """
+
+    def __init__(self, npz_file, key):
+        self.npz_file = npz_file
+        self.key = key
+        self.array = None
+
+    def load(self):
+        if self.array is None:
+            self.array = self.npz_file[self.key]
+        return self.array
+
+    def __getitem__(self, index):
+        return self.load()[index]
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.load(), dtype=dtype)
+
+
+def _memmap_npz_member(filename, zip_file, key, mmap_mode):
+    """
+    Memory-map an array stored uncompressed in a .npz file.
+
+    Returns:
+        array (numpy memmap): array mapped from the .npz file
+    """
+    info = zip_file.getinfo(f"{key}.npy")
+
+    # the local file header is 30 bytes followed by the file name and extra
+    # field, whose lengths are stored at the end of the header
+    with open(filename, "rb") as file:
+        file.seek(info.header_offset + 26)
+        name_length, extra_length = np.frombuffer(file.read(4), dtype="<u2")
+    member_offset = info.header_offset + 30 + int(name_length + extra_length)
+
+    with zip_file.open(info) as member:
+        version = np.lib.format.read_magic(member)
+        if version == (1, 0):
+            header = np.lib.format.read_array_header_1_0(member)
+        else:
+            header = np.lib.format.read_array_header_2_0(member)
+        shape, fortran_order, dtype = header
+        data_offset = member_offset + member.tell()
+
+    return np.memmap(
+        filename,
+        dtype=dtype,
+        mode=mmap_mode,
+        shape=shape,
+        order="F" if fortran_order else "C",
+        offset=data_offset,
+    )
+
+
+def _read_parastell_npz(filename, mmap_mode):
+    """Read a parastell build from a .npz file, see read_parastell_build"""
+    npz_file = np.load(filename, allow_pickle=False)
+    zip_file = npz_file.zip
+
+    parastell_build_dict = {"radial_build": {}}
+    for key in npz_file.files:
+        if not key.startswith("radial_build/"):
+            value = npz_file[key]
+            parastell_build_dict[key] = (
+                value.item() if value.ndim == 0 else value
+            )
+            continue
+
+        # layer names in files written elsewhere may contain "/"
+        layer_name, field = key[len("radial_build/") :].rsplit("/", 1)
+        layer = parastell_build_dict["radial_build"].setdefault(layer_name, {})
+
+        if field != "thickness_matrix":
+            layer[field] = npz_file[key].item()
+        elif (
+            mmap_mode is not None
+            and zip_file.getinfo(f"{key}.npy").compress_type
+            == zipfile.ZIP_STORED
+        ):
+            layer[field] = _memmap_npz_member(
+                filename, zip_file, key, mmap_mode
+            )
+        else:
+            layer[field] = _DeferredNpzArray(npz_file, key)
+
+    return parastell_build_dict
+
+
+def _read_parastell_hdf5(filename):
+    """Read a parastell build from an HDF5 file, see read_parastell_build"""
+    import h5py
+
+    file = h5py.File(filename, "r")
+
+    parastell_build_dict = {"radial_build": {}}
+    for key, value in file.items():
+        if key != "radial_build":
+            parastell_build_dict[key] = value[()]
+
+    for layer_name, group in file["radial_build"].items():
+        h5m_tag = group.attrs["h5m_tag"]
+        if isinstance(h5m_tag, bytes):
+            h5m_tag = h5m_tag.decode()
+        parastell_build_dict["radial_build"][layer_name] = {
+            "thickness_matrix": _LazyMatrix(group["thickness_matrix"]),
+            "h5m_tag": h5m_tag,
+        }
+
+    return parastell_build_dict
+
+
+def read_parastell_build(filename, mmap_mode="r"):
+    """
+    Read a parastell build from a .npz or HDF5 (.h5, .hdf5) file, without
+    loading the layer thickness matrices into memory. Uncompressed .npz
+    thickness matrices are memory-mapped, compressed ones are read the first
+    time they are accessed, and HDF5 thickness matrices are read slice by
+    slice as they are indexed.
+
+    Files written by write_parastell_build have the expected layout:
+        phi_list, theta_list: 1D angle grids
+        radial_build/<layer name>/thickness_matrix: 2D thickness matrix
+        radial_build/<layer name>/h5m_tag: material tag of the layer, stored
+            as an attribute of the layer group in HDF5 files
+
+    Arguments:
+        filename (str): path to the .npz or HDF5 file
+        mmap_mode (str): memory-map mode used for .npz files, if None the
+            thickness matrices are read the first time they are accessed
+
+    Returns:
+        parastell_build_dict (dict): parastell build dict, containing
+            "phi_list", "theta_list" and "radial_build"
+    """
+    if str(filename).endswith((".h5", ".hdf5")):
+        return _read_parastell_hdf5(filename)
+
+    return _read_parastell_npz(filename, mmap_mode)
+
+
+def write_parastell_build(parastell_build_dict, filename):
+    """
+    Write a parastell build to a .npz or HDF5 (.h5, .hdf5) file that can be
+    read lazily by read_parastell_build. .npz files are written uncompressed
+    so that the thickness matrices can be memory-mapped. Layer names can't
+    contain "/", which separates the layer name from its fields in .npz
+    files and nests groups in HDF5 files.
+
+    Arguments:
+        parastell_build_dict (dict): parastell build dict, containing
+            "phi_list", "theta_list" and "radial_build"
+        filename (str): path to the .npz or HDF5 file
+    """
+    radial_build = parastell_build_dict["radial_build"]
+    for layer_name in radial_build:
+        if "/" in layer_name:
+            raise ValueError(
+                f'layer name "{layer_name}" contains "/", which can\'t be '
+                "written to .npz or HDF5 files"
+            )
+    others = {
+        key: value
+        for key, value in parastell_build_dict.items()
+        if key != "radial_build"
+    }
+
+    if str(filename).endswith((".h5", ".hdf5")):
+        import h5py
+
+        with h5py.File(filename, "w", track_order=True) as file:
+            for key, value in others.items():
+                file[key] = value
+            build_group = file.create_group("radial_build", track_order=True)
+            for layer_name, layer in radial_build.items():
+                group = build_group.create_group(layer_name)
+                group["thickness_matrix"] = np.asarray(
+                    layer["thickness_matrix"]
+                )
+                group.attrs["h5m_tag"] = layer["h5m_tag"]
+        return
+
+    arrays = dict(others)
+    for layer_name, layer in radial_build.items():
+        arrays[f"radial_build/{layer_name}/thickness_matrix"] = np.asarray(
+            layer["thickness_matrix"]
+        )
+        arrays[f"radial_build/{layer_name}/h5m_tag"] = layer["h5m_tag"]
+
+    np.savez(filename, **arrays)
@@ -0,0 +1,842 @@
+import itertools
+import os
+import textwrap
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+
+import matplotlib.colors
+import numpy as np
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
+
+from .build import RadialBuild
+from .parastell import (
+    _thickness_extremes,
+    read_parastell_build,
+    sample_parastell_build,
+    stack_parastell_build,
+)
+from .profiling import profiled, stage
+from .serialization import write_json, write_yaml
+
+# plot settings that can be passed to RadialBuildPlot and are written to
+# yml files alongside the build
+PLOT_ATTRIBUTES = (
+    "title",
+    "colors",
+    "max_characters",
+    "max_thickness",
+    "size",
+    "unit",
+)
+
+# file formats plots can be written in. png is rasterized with Agg, svg and
+# pdf are written as vectors without rasterizing.
+OUTPUT_FORMATS = ("png", "svg", "pdf")
+
+# marks a layer entry that is not present in the layer dict
+_MISSING = object()
+
+
+class RadialBuildPlot(object):
+    """
+    Uses a radial build definition to generate radial build plots.
+
+    Parameters
+        build (dict or RadialBuild): {"layer name": {
+                            "thickness": (float),
+                            "composition": {
+                                "material name": fraction (float)
+                                },
+                            "description": (str),
+                    }
+                }
+            The dict corresponding to each "layer_name" key may be empty,
+            or have any combination of entries. A RadialBuild is converted
+            to this format when the plot first uses its build.
+    Optional attributes:
+        title (string): title for plot and filename to save to
+        colors (list of str): list of matplotlib color strings.
+            If specific colors are desired for each layer they can be added
+            here.
+        max_characters (float): maximum length of a line before wrapping the
+            text
+        max_thickness (float): maximum thickness of layer to display, useful
+            for reducing the total size of the figure.
+        size (iter of float): figure size, inches. (width, height)
+        unit (str): Unit of thickness values
+    """
+
+    def __init__(self, build, **kwargs):
+        self.build = build
+        self.title = "radial_build"
+        self.colors = _default_colors(len(build))
+        self.max_characters = 35
+        self.max_thickness = 1e6
+        self.size = (8, 4)
+        self.unit = "cm"
+        for name in kwargs.keys() & PLOT_ATTRIBUTES:
+            self.__setattr__(name, kwargs[name])
+
+    @property
+    def build(self):
+        """
+        Build dict of the plot. A RadialBuild given as the build is only
+        converted to a dict when the build is first used, so plots that are
+        never drawn or written do not copy it.
+        """
+        if isinstance(self._build, RadialBuild):
+            self._build = self._build.to_dict()
+        return self._build
+
+    @build.setter
+    def build(self, build):
+        self._build = build
+
+    def build_composition_string(self, composition):
+        """
+        Assembles string from composition dict for use in radial build plot
+
+        Arguments:
+            composition (dict): "material name (str)":volume_fraction (float)
+
+        Returns:
+            comp_string (string): formatted string with composition definition
+        """
+
+        """comp_string = ""
+        for material, fraction in composition.items():
+
+            mat_string = f"{material}: {round(fraction*100, 3)}%, "
+            comp_string += mat_string
+        comp_string = textwrap.fill(
+            comp_string, width=self.max_characters, drop_whitespace=False
+        )
+
+        return comp_string[0:-2] + "\n
+        """
+        return _composition_string(
+            _composition_key(composition), self.max_characters
+        )
+
+    def to_dict(self):
+        """
+        Get the definition of the radial build plot, which can be passed back
+        to RadialBuildPlot as keyword arguments. Only the build and the plot
+        settings are included, not the figure or other state.
+
+        Returns:
+            data (dict): build and plot settings
+        """
+        data = {"build": self.build}
+        for name in PLOT_ATTRIBUTES:
+            data[name] = getattr(self, name)
+        data["colors"] = list(self.colors)
+        data["size"] = list(self.size)
+
+        return data
+
+    def write_yml(self, filename=None):
+        """
+        Writes yml file defining radial build plot.
+
+        Arguments:
+            filename (str): Optional, path of the yml file. If None, file
+                will be called title.yml
+        """
+        if filename is None:
+            filename = self.title.replace(" ", "") + ".yml"
+
+        write_yaml(self.to_dict(), filename)
+
+    def write_json(self, filename=None):
+        """
+        Writes compact json file defining radial build plot. Numpy arrays in
+        the build are kept as arrays, see serialization.write_json.
+
+        Arguments:
+            filename (str): Optional, path of the json file. If None, file
+                will be called title.json
+        """
+        if filename is None:
+            filename = self.title.replace(" ", "") + ".json"
+
+        write_json(self.to_dict(), filename)
+
+    @profiled
+    def get_layer_string(self, name, layer):
+        """
+        Processes a layer in the radial build dict to get formatted text for
+        the plot
+
+        Returns:
+            text (str): formatted text for layer
+            visual_thickness (float): width of the rectangle for the layer
+        """
+        key = (
+            name,
+            layer.get("thickness", _MISSING),
+            (
+                _composition_key(layer["composition"])
+                if "composition" in layer
+                else _MISSING
+            ),
+            layer.get("description", _MISSING),
+            self.max_characters,
+            self.unit,
+        )
+        try:
+            text, visual_thickness = _layer_string(*key)
+        except TypeError:
+            # unhashable layer entries can't be cached
+            text, visual_thickness = _layer_string.__wrapped__(*key)
+
+        visual_thickness = min(visual_thickness, self.max_thickness)
+
+        return text, visual_thickness
+
+    @profiled
+    def get_layer_layout(self):
+        """
+        Computes the position, width and text of each layer drawn in the
+        radial build plot. Layers with zero thickness are skipped.
+
+        Returns:
+            layers (list of tuple): (layer_str, x, visual_thickness, color)
+                for each drawn layer, where x is the lower left corner of the
+                layer rectangle
+            height (float): height of the layer rectangles
+            total_thickness (float): total width of the drawn layers
+        """
+        char_to_height = 1.15
+        height = char_to_height * self.max_characters
+
+        layers = []
+        # lower left corner of each layer rectangle
+        x = 0
+        for (name, layer), color in zip(self.build.items(), self.colors):
+
+            if layer.get("thickness") == 0:
+                continue
+
+            layer_str, visual_thickness = self.get_layer_string(name, layer)
+            layers.append((layer_str, x, visual_thickness, color))
+
+            x += float(visual_thickness)
+
+        return layers, height, x
+
+    @profiled
+    def plot_radial_build(self):
+        """
+        Creates a radial build plot, with layers scaled between a minimum and
+        maximum pixel width to preserve readability.
+
+        Returns:
+            fig (matplotlib figure): figure containing radial build plot
+        """
+        layers, height, total_thickness = self.get_layer_layout()
+
+        fig = Figure(figsize=self.size)
+        fig.tight_layout()
+        ax = fig.add_subplot()
+        ax.set_ylim(0, height + 1)
+
+        for layer_str, x, visual_thickness, color in layers:
+            ax.add_patch(
+                Rectangle(
+                    (x, 0),
+                    visual_thickness,
+                    height,
+                    facecolor=color,
+                    edgecolor="black",
+                )
+            )
+
+            centerx = x + visual_thickness / 2 + 1
+            centery = height / 2
+            ax.text(
+                centerx,
+                centery,
+                layer_str,
+                rotation="vertical",
+                ha="center",
+                va="center",
+            )
+
+        ax.set_xlim(-1, total_thickness + 1)
+        ax.set_axis_off()
+        ax.set_title(self.title)
+        self.figure = fig
+
+        return fig
+
+    @profiled
+    def save(self, filename=None, file_format="png", dpi=200, cache=None):
+        """
+        Write the plot to a png, svg or pdf file. svg and pdf files are
+        written as vectors, so their cost does not grow with figure size.
+
+        Arguments:
+            filename (str): Optional, file name to write the plot to, without
+                extension. If None, file name will be the same as the plot
+                title
+            file_format (str): Optional, one of "png", "svg" or "pdf"
+            dpi (float): Optional, resolution of png files
+            cache (RenderCache): Optional, cache of rendered plots. If this
+                plot is in the cache, the cached file is copied without
+                plotting. Otherwise the plot is drawn again from the current
+                attributes, so a figure drawn before they changed is never
+                stored under their key, and added to the cache.
+
+        Returns:
+            plot_file (str): path of the file written
+        """
+        if file_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"file_format must be one of {OUTPUT_FORMATS}, not "
+                f"{file_format!r}"
+            )
+        if filename is None:
+            filename = self.title.replace(" ", "")
+        plot_file = f"{filename}.{file_format}"
+
+        if cache is not None:
+            key = cache.get_key(self, file_format, dpi)
+            if cache.fetch(key, plot_file):
+                return plot_file
+            self.plot_radial_build()
+            # the file may be hard-linked to a cache entry
+            if os.path.lexists(plot_file):
+                os.remove(plot_file)
+
+        with stage("savefig"):
+            self.figure.savefig(plot_file, format=file_format, dpi=dpi)
+
+        if cache is not None:
+            cache.store(key, plot_file)
+
+        return plot_file
+
+    def to_png(self, filename=None, cache=None, dpi=200):
+        """
+        Write the plot to a png file.
+
+        Arguments:
+            filename (str): Optional, file name to write the plot to. If None,
+                file name will be the same as the plot title
+            cache (RenderCache): Optional, cache of rendered plots, see save
+            dpi (float): Optional, resolution of the png
+        """
+        self.save(filename, "png", dpi, cache)
+
+    @classmethod
+    def from_parastell_build(
+        cls, parastell_build_dict, phi, theta, interpolate=False
+    ):
+        """
+        Create a radial build plot from a parastell build at a given angle.
+
+        Arguments:
+            parastell_build_dict (dict): parastell build dict, containing
+                "phi_list", "theta_list" and "radial_build"
+            phi (float): toroidal angle of the radial build
+            theta (float): poloidal angle of the radial build
+            interpolate (bool): if True, bilinearly interpolate the layer
+                thicknesses between the neighbouring grid points, otherwise
+                use the nearest grid point
+
+        Returns:
+            radial_build (RadialBuildPlot): radial build plot at phi, theta
+        """
+        layer_names, h5m_tags, thicknesses = sample_parastell_build(
+            parastell_build_dict, phi, theta, interpolate=interpolate
+        )
+        build = {}
+        # build the dictionary for plotting
+        for layer_name, material, thickness in zip(
+            layer_names, h5m_tags, thicknesses
+        ):
+            build[layer_name] = {
+                "thickness": float(thickness),
+                "description": material,
+            }
+
+        radial_build = cls(build)
+
+        return radial_build
+
+    @classmethod
+    def from_parastell_file(
+        cls, filename, phi, theta, interpolate=False, mmap_mode="r"
+    ):
+        """
+        Create a radial build plot from a parastell build stored in a .npz or
+        HDF5 file at a given angle. Only the parts of the thickness matrices
+        needed for the requested angle are read from disk.
+
+        Arguments:
+            filename (str): path to the .npz or HDF5 file, see
+                read_parastell_build for the expected layout
+            phi (float): toroidal angle of the radial build
+            theta (float): poloidal angle of the radial build
+            interpolate (bool): if True, bilinearly interpolate the layer
+                thicknesses between the neighbouring grid points, otherwise
+                use the nearest grid point
+            mmap_mode (str): memory-map mode used for .npz files
+
+        Returns:
+            radial_build (RadialBuildPlot): radial build plot at phi, theta
+        """
+        parastell_build_dict = read_parastell_build(filename, mmap_mode)
+
+        return cls.from_parastell_build(
+            parastell_build_dict, phi, theta, interpolate=interpolate
+        )
+
+    @classmethod
+    def from_parastell_sweep(cls, parastell_build_dict, **kwargs):
+        """
+        Generate radial build plots for every (phi, theta) pair in a parastell
+        build. The layer thickness matrices are stacked once, and the build
+        of each plot is a RadialBuild whose thicknesses and radii are views
+        into the stacked arrays, so no thickness data is copied for an angle
+        until its plot is drawn. Plots without colors in kwargs share one
+        list of default colors.
+
+        Arguments:
+            parastell_build_dict (dict): parastell build dict, containing
+                "phi_list", "theta_list" and "radial_build"
+            kwargs: optional RadialBuildPlot attributes, passed to each plot
+
+        Yields:
+            phi (float): toroidal angle of the radial build
+            theta (float): poloidal angle of the radial build
+            radial_build (RadialBuildPlot): radial build plot at phi, theta
+        """
+        layer_names, h5m_tags, thicknesses = stack_parastell_build(
+            parastell_build_dict
+        )
+        phi_list = parastell_build_dict["phi_list"]
+        theta_list = parastell_build_dict["theta_list"]
+        kwargs.setdefault("colors", _default_colors(len(layer_names)))
+
+        thicknesses.flags.writeable = False
+        radii = np.nancumsum(thicknesses, axis=0)
+        radii.flags.writeable = False
+        names = tuple(layer_names)
+        descriptions = tuple(h5m_tags)
+        unset = (None,) * len(names)
+
+        for phi_index, phi in enumerate(phi_list):
+            for theta_index, theta in enumerate(theta_list):
+                radial_build = RadialBuild._from_columns(
+                    names,
+                    thicknesses[:, phi_index, theta_index],
+                    radii[:, phi_index, theta_index],
+                    unset,
+                    unset,
+                    descriptions,
+                    unset,
+                )
+                yield float(phi), float(theta), cls(radial_build, **kwargs)
+
+
+def _default_colors(num_layers):
+    """Default colors of a plot with num_layers layers"""
+    return list(
+        itertools.islice(matplotlib.colors.XKCD_COLORS.values(), num_layers)
+    )
+
+
+def plot_parastell_summary(
+    parastell_build_dict, title="parastell build", columns=4, size=None
+):
+    """
+    Summarize a parastell build over every angle in one figure, with a
+    heatmap of each layer's thickness matrix over the phi, theta grid and a
+    map of the total depth of the build. The angles of minimum and maximum
+    total thickness are marked on every heatmap.
+
+    Arguments:
+        parastell_build_dict (dict): parastell build dict, containing
+            "phi_list", "theta_list" and "radial_build"
+        title (str): Optional, title of the figure
+        columns (int): Optional, maximum number of heatmaps per row
+        size (tuple of float): Optional, figure size in inches. If None, each
+            heatmap is 4 by 3 inches
+
+    Returns:
+        fig (matplotlib figure): figure containing the heatmaps
+    """
+    layer_names, _, thicknesses = stack_parastell_build(parastell_build_dict)
+    phi_list = np.asarray(parastell_build_dict["phi_list"], dtype=float)
+    theta_list = np.asarray(parastell_build_dict["theta_list"], dtype=float)
+    total_thickness = thicknesses.sum(axis=0)
+    extremes = _thickness_extremes(total_thickness, phi_list, theta_list)
+
+    maps = list(zip(layer_names, thicknesses))
+    maps.append(("total depth", total_thickness))
+
+    columns = min(columns, len(maps))
+    rows = -(-len(maps) // columns)
+    if size is None:
+        size = (4 * columns, 3 * rows)
+
+    fig = Figure(figsize=size, layout="constrained")
+    axes = fig.subplots(rows, columns, squeeze=False).ravel()
+
+    for ax, (name, matrix) in zip(axes, maps):
+        # matrices are indexed [phi, theta], phi is plotted on the x axis
+        mesh = ax.pcolormesh(phi_list, theta_list, matrix.T, shading="nearest")
+        fig.colorbar(mesh, ax=ax)
+        for label, marker in (("min", "v"), ("max", "^")):
+            phi, theta, _ = extremes[label]
+            ax.plot(
+                phi,
+                theta,
+                marker=marker,
+                color="red",
+                markeredgecolor="black",
+                linestyle="none",
+            )
+        ax.set_title(name)
+        ax.set_xlabel("phi")
+        ax.set_ylabel("theta")
+
+    for ax in axes[len(maps) :]:
+        ax.set_axis_off()
+
+    fig.suptitle(
+        f"{title}\n"
+        + ", ".join(
+            f"{label} total thickness {total:.4g} at phi={phi:.4g}, "
+            f"theta={theta:.4g}"
+            for label, (phi, theta, total) in extremes.items()
+        )
+    )
+
+    return fig
+
+
+def _composition_key(composition):
+    """
+    Hashable form of a composition dict for the cached string functions. The
+    type of each fraction is included, as 1 and 1.0 compare equal but are
+    formatted differently.
+
+    Arguments:
+        composition (dict): "material name (str)":volume_fraction (float)
+
+    Returns:
+        key (tuple): (material name, fraction type, fraction) triples
+    """
+    return tuple((mat, type(frac), frac) for mat, frac in composition.items())
+
+
+@lru_cache(maxsize=4096, typed=True)
+def _composition_string(composition, max_characters):
+    """
+    Assembles string from composition items for use in radial build plot
+
+    Arguments:
+        composition (tuple): composition key, see _composition_key
+        max_characters (float): maximum length of a line before wrapping
+
+    Returns:
+        comp_string (string): formatted string with composition definition
+    """
+    mat_strings = [
+        f"{mat}: {round(frac*100,3)}%" for mat, _, frac in composition
+    ]
+
+    comp_string = (
+        textwrap.fill(", ".join(mat_strings), width=max_characters) + "\n"
+    )
+
+    return comp_string
+
+
+@lru_cache(maxsize=4096, typed=True)
+def _layer_string(
+    name, thickness, composition, description, max_characters, unit
+):
+    """
+    Formats the text for a layer of a radial build plot. Layer entries that
+    are not present are passed as _MISSING.
+
+    Returns:
+        text (str): formatted text for layer
+        visual_thickness (float): width of the rectangle for the layer,
+            before limiting to the maximum thickness of the plot
+    """
+    min_line_height = 9
+    visual_thickness = min_line_height
+
+    thickness_str = ""
+    if thickness is not _MISSING:
+        thickness_str = f": {thickness} {unit}"
+        visual_thickness = thickness
+
+    comp_string = ""
+    if composition is not _MISSING:
+        comp_string = _composition_string(composition, max_characters)
+
+    description_str = ""
+    if description is not _MISSING:
+        description_str = textwrap.fill(
+            f"{description}",
+            max_characters,
+            drop_whitespace=False,
+        )
+
+    # ensure sensible line breaks, this is the simplest way I have
+    # found due to how the above fields can be combined
+    text = f"{name}{thickness_str}\n{comp_string}{description_str}".rstrip()
+
+    newlines = text.count("\n")
+
+    min_thickness = (newlines + 1) * min_line_height
+
+    visual_thickness = max(visual_thickness, min_thickness)
+
+    return text, visual_thickness
+
+
+def layer_string_cache_info():
+    """
+    Get hit and miss statistics for the cache of formatted layer text
+
+    Returns:
+        cache_info (named tuple): (hits, misses, maxsize, currsize)
+    """
+    return _layer_string.cache_info()
+
+
+def clear_layer_string_cache():
+    """Empty the cache of formatted layer text and reset its statistics"""
+    _layer_string.cache_clear()
+    _composition_string.cache_clear()
+
+
+class RadialBuildFigure(object):
+    """
+    A reusable figure for rendering many radial build plots with the same
+    number of layers. The figure, axes and layer artists are created once,
+    and only the layer geometry, text and title are updated for each plot.
+    Call close() to release the figure when done.
+
+    Parameters
+        radial_build (RadialBuildPlot): radial build plot used to create the
+            figure, which is drawn immediately
+    """
+
+    def __init__(self, radial_build):
+        self.num_layers = len(radial_build.build)
+        self.figure = Figure(figsize=radial_build.size)
+        self.figure.tight_layout()
+        self.ax = self.figure.add_subplot()
+        self.ax.set_axis_off()
+
+        self.rectangles = []
+        self.texts = []
+        for _ in range(self.num_layers):
+            self.rectangles.append(
+                self.ax.add_patch(Rectangle((0, 0), 0, 0, edgecolor="black"))
+            )
+            self.texts.append(
+                self.ax.text(
+                    0, 0, "", rotation="vertical", ha="center", va="center"
+                )
+            )
+
+        self.update(radial_build)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @profiled
+    def update(self, radial_build):
+        """
+        Redraw the figure for a radial build plot, updating the existing
+        layer artists in place.
+
+        Arguments:
+            radial_build (RadialBuildPlot): radial build plot to draw, with
+                the same number of layers as the figure
+        """
+        if len(radial_build.build) != self.num_layers:
+            raise ValueError(
+                f"radial build has {len(radial_build.build)} layers, figure "
+                f"was created for {self.num_layers}"
+            )
+
+        layers, height, total_thickness = radial_build.get_layer_layout()
+
+        for index, (rectangle, text) in enumerate(
+            zip(self.rectangles, self.texts)
+        ):
+            # zero thickness layers are not drawn
+            if index >= len(layers):
+                rectangle.set_visible(False)
+                text.set_visible(False)
+                continue
+
+            layer_str, x, visual_thickness, color = layers[index]
+            rectangle.set_bounds(x, 0, visual_thickness, height)
+            rectangle.set_facecolor(color)
+            rectangle.set_visible(True)
+            text.set_position((x + visual_thickness / 2 + 1, height / 2))
+            text.set_text(layer_str)
+            text.set_visible(True)
+
+        self.figure.set_size_inches(radial_build.size)
+        self.ax.set_ylim(0, height + 1)
+        self.ax.set_xlim(-1, total_thickness + 1)
+        self.ax.set_title(radial_build.title)
+        self.title = radial_build.title
+
+    @profiled
+    def save(self, filename=None, file_format="png", dpi=200):
+        """
+        Write the current plot to a png, svg or pdf file.
+
+        Arguments:
+            filename (str): Optional, file name to write the plot to, without
+                extension. If None, file name will be the same as the plot
+                title
+            file_format (str): Optional, one of "png", "svg" or "pdf"
+            dpi (float): Optional, resolution of png files
+
+        Returns:
+            plot_file (str): path of the file written
+        """
+        if file_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"file_format must be one of {OUTPUT_FORMATS}, not "
+                f"{file_format!r}"
+            )
+        if filename is None:
+            filename = self.title.replace(" ", "")
+        plot_file = f"{filename}.{file_format}"
+
+        with stage("savefig"):
+            self.figure.savefig(plot_file, format=file_format, dpi=dpi)
+
+        return plot_file
+
+    def to_png(self, filename=None, dpi=200):
+        """
+        Write the current plot to a png file.
+
+        Arguments:
+            filename (str): Optional, file name to write the plot to. If None,
+                file name will be the same as the plot title
+            dpi (float): Optional, resolution of the png
+        """
+        self.save(filename, "png", dpi)
+
+    def close(self):
+        """
+        Release the figure and its artists
+        """
+        self.figure.clear()
+        self.figure = None
+        self.ax = None
+        self.rectangles = []
+        self.texts = []
+
+
+def _render_to_file(
+    radial_build, filename, cache=None, file_format="png", dpi=200
+):
+    """Plot a radial build and write it to a file, for use by workers"""
+    # with a cache, save only plots if the file is not cached
+    if cache is None:
+        radial_build.plot_radial_build()
+
+    return radial_build.save(filename, file_format, dpi, cache)
+
+
+def render_radial_builds(
+    radial_builds,
+    filenames=None,
+    workers=None,
+    cache=None,
+    file_format="png",
+    dpi=200,
+):
+    """
+    Plot many radial builds and write each to a file, using a pool of worker
+    processes.
+
+    Arguments:
+        radial_builds (iter of RadialBuildPlot): radial build plots to render
+        filenames (iter of str): Optional, file names to write each plot to,
+            without extension. If None, file names will be the same as the
+            plot titles
+        workers (int): Optional, number of worker processes. If None, the
+            number of processors on the machine is used. If 1, plots are
+            rendered in the current process.
+        cache (RenderCache): Optional, cache of rendered plots, see save
+        file_format (str): Optional, one of "png", "svg" or "pdf"
+        dpi (float): Optional, resolution of png files
+
+    Returns:
+        plot_files (list of str): paths of the files written
+    """
+    radial_builds = list(radial_builds)
+    if filenames is None:
+        filenames = [None] * len(radial_builds)
+    render = partial(
+        _render_to_file, cache=cache, file_format=file_format, dpi=dpi
+    )
+
+    if workers == 1:
+        return list(map(render, radial_builds, filenames))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(render, radial_builds, filenames))
+
+
+def render_multipage_pdf(radial_builds, filename):
+    """
+    Write many radial build plots to a single pdf file, one plot per page.
+    Plots are drawn into a reused RadialBuildFigure while they have the same
+    number of layers, so a parastell angle sweep is written without creating
+    a figure per plot.
+
+    Arguments:
+        radial_builds (iter of RadialBuildPlot): radial build plots to write,
+            read one at a time so a generator such as
+            RadialBuildPlot.from_parastell_sweep can be streamed
+        filename (str): path of the pdf file, including extension
+
+    Returns:
+        num_pages (int): number of plots written
+    """
+    figure = None
+    num_pages = 0
+    try:
+        with PdfPages(filename) as pdf:
+            for radial_build in radial_builds:
+                if figure is not None and figure.num_layers == len(
+                    radial_build.build
+                ):
+                    figure.update(radial_build)
+                else:
+                    if figure is not None:
+                        figure.close()
+                    figure = RadialBuildFigure(radial_build)
+                with stage("savefig"):
+                    pdf.savefig(figure.figure)
+                num_pages += 1
+    finally:
+        if figure is not None:
+            figure.close()
+
+    return num_pages
@@ -0,0 +1,204 @@
+import functools
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# enabled profilers, every stage is recorded by each of them
+_profilers = []
+# [stage name, traced memory at start, peak seen before nested stages] of
+# the stages being recorded, innermost last
+_stage_stack = []
+
+
+class Profiler(object):
+    """
+    Records the wall time, number of calls and peak memory allocated by each
+    pipeline stage while enabled. Stages are the plotting, saving and model
+    building methods marked with profiled, and nested stages are included in
+    the time and memory of the stages calling them. When no profiler is
+    enabled, stages cost one list check per call.
+
+    Profilers are enabled as context managers:
+
+        with Profiler() as profiler:
+            radial_build.plot_radial_build()
+        print(profiler.format_report())
+
+    Parameters
+        trace_memory (bool): if True, trace peak Python allocations with
+            tracemalloc, which slows down the profiled code several times
+        callback (callable): Optional, called as callback(stage, seconds,
+            peak_memory) after each stage, peak_memory is None when memory
+            is not traced
+    """
+
+    def __init__(self, trace_memory=False, callback=None):
+        self.trace_memory = trace_memory
+        self.callback = callback
+        self.stats = {}
+        self._started_tracing = False
+
+    def __enter__(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        _profilers.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _profilers.remove(self)
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def record(self, stage, seconds, peak_memory=None):
+        """
+        Add a call of a stage to the statistics.
+
+        Arguments:
+            stage (str): name of the stage
+            seconds (float): wall time of the call
+            peak_memory (int): Optional, peak bytes allocated during the call
+        """
+        stats = self.stats.setdefault(
+            stage,
+            {"calls": 0, "total_time": 0.0, "max_time": 0.0, "peak_memory": 0},
+        )
+        stats["calls"] += 1
+        stats["total_time"] += seconds
+        stats["max_time"] = max(stats["max_time"], seconds)
+        if peak_memory is not None:
+            stats["peak_memory"] = max(stats["peak_memory"], peak_memory)
+
+        if self.callback is not None:
+            self.callback(stage, seconds, peak_memory)
+
+    def merge(self, stats):
+        """
+        Add the statistics of another profiler, such as one run in a worker
+        process.
+
+        Arguments:
+            stats (dict): stats attribute of the other profiler
+        """
+        for stage, other in stats.items():
+            if stage not in self.stats:
+                self.stats[stage] = dict(other)
+                continue
+            own = self.stats[stage]
+            own["calls"] += other["calls"]
+            own["total_time"] += other["total_time"]
+            own["max_time"] = max(own["max_time"], other["max_time"])
+            own["peak_memory"] = max(own["peak_memory"], other["peak_memory"])
+
+    def get_report(self):
+        """
+        Get the statistics of each stage, slowest first.
+
+        Returns:
+            report (dict): stage name mapped to {
+                "calls": (int) number of calls,
+                "total_time": (float) seconds spent in the stage,
+                "mean_time": (float) mean seconds per call,
+                "max_time": (float) seconds of the slowest call,
+                "peak_memory": (int) largest peak bytes allocated by a call,
+                    0 if memory was not traced by any profiler
+            }
+        """
+        return {
+            stage: dict(stats, mean_time=stats["total_time"] / stats["calls"])
+            for stage, stats in sorted(
+                self.stats.items(), key=lambda item: -item[1]["total_time"]
+            )
+        }
+
+    def format_report(self):
+        """
+        Format the statistics of each stage as a table, slowest first.
+
+        Returns:
+            table (str): one line per stage
+        """
+        report = self.get_report()
+        width = max([len(stage) for stage in report] + [len("stage")])
+        lines = [
+            f"{'stage':<{width}} {'calls':>8} {'total s':>10} "
+            f"{'mean ms':>10} {'max ms':>10} {'peak MB':>10}"
+        ]
+        for stage, stats in report.items():
+            lines.append(
+                f"{stage:<{width}} {stats['calls']:>8} "
+                f"{stats['total_time']:>10.3f} "
+                f"{stats['mean_time'] * 1e3:>10.3f} "
+                f"{stats['max_time'] * 1e3:>10.3f} "
+                f"{stats['peak_memory'] / 1e6:>10.2f}"
+            )
+
+        return "\n".join(lines)
+
+    def write_report(self, filename):
+        """
+        Write the statistics of each stage to a JSON file, see get_report.
+
+        Arguments:
+            filename (str): path of the JSON file
+        """
+        with open(filename, "w") as file:
+            json.dump(self.get_report(), file, indent=2)
+
+
+@contextmanager
+def stage(name):
+    """
+    Record the enclosed code as a pipeline stage in the enabled profilers.
+
+    Arguments:
+        name (str): name of the stage
+    """
+    if not _profilers:
+        yield
+        return
+
+    # peaks are only reset when asked for, so other tracemalloc users are
+    # not disturbed
+    tracing = tracemalloc.is_tracing() and any(
+        profiler.trace_memory for profiler in _profilers
+    )
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        if _stage_stack:
+            _stage_stack[-1][2] = max(_stage_stack[-1][2], peak)
+        tracemalloc.reset_peak()
+        _stage_stack.append([name, current, current])
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        peak_memory = None
+        if tracing:
+            _, start_memory, nested_peak = _stage_stack.pop()
+            peak = max(nested_peak, tracemalloc.get_traced_memory()[1])
+            peak_memory = peak - start_memory
+            if _stage_stack:
+                _stage_stack[-1][2] = max(_stage_stack[-1][2], peak)
+        for profiler in list(_profilers):
+            profiler.record(name, seconds, peak_memory)
+
+
+def profiled(function):
+    """
+    Decorator recording calls of a function as a pipeline stage named after
+    its qualified name, see stage.
+    """
+    name = function.__qualname__
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not _profilers:
+            return function(*args, **kwargs)
+        with stage(name):
+            return function(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import matplotlib
+
+# bump to invalidate existing caches when the plot drawing changes
+CACHE_VERSION = 1
+
+# attributes of RadialBuildPlot that change the rendered plot
+DISPLAY_ATTRIBUTES = (
+    "colors",
+    "max_characters",
+    "max_thickness",
+    "size",
+    "unit",
+    "title",
+)
+
+# layer entries that change the rendered plot
+LAYER_ENTRIES = ("thickness", "composition", "description")
+
+# extensions of cached plot files
+CACHE_EXTENSIONS = (".png", ".svg", ".pdf")
+
+
+def _to_json(value):
+    """Convert numpy values for json serialization"""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"{type(value)} can't be used in a render cache key")
+
+
+class RenderCache(object):
+    """
+    On-disk cache of rendered radial build plot files, keyed on a hash of the
+    build, the display attributes of the plot and the output format. Entries
+    are evicted least recently used first once the cache grows past
+    max_bytes.
+
+    Parameters
+        directory (str): directory to store cached plots in, created if it
+            does not exist
+        max_bytes (int): maximum total size of the cached plots
+        hard_link (bool): if True, plots are hard-linked out of the cache
+            instead of copied, when the file system allows it. Linked files
+            share storage with the cache, so they must not be modified in
+            place.
+    """
+
+    def __init__(self, directory, max_bytes=500_000_000, hard_link=False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hard_link = hard_link
+        os.makedirs(directory, exist_ok=True)
+
+    def get_key(self, radial_build, file_format="png", dpi=200):
+        """
+        Compute the cache key of a radial build plot. Layer entries that are
+        not drawn are ignored, and the order of entries within a layer does
+        not matter, but layer order and composition order do.
+
+        Arguments:
+            radial_build (RadialBuildPlot): plot to compute the key for
+            file_format (str): format the plot is written in
+            dpi (float): resolution the plot is written at
+
+        Returns:
+            key (str): hex digest identifying the rendered plot
+        """
+        build = [
+            [
+                name,
+                {
+                    entry: layer[entry]
+                    for entry in LAYER_ENTRIES
+                    if entry in layer
+                },
+            ]
+            for name, layer in radial_build.build.items()
+        ]
+        for _, layer in build:
+            if "composition" in layer:
+                layer["composition"] = list(layer["composition"].items())
+
+        attributes = {
+            name: getattr(radial_build, name) for name in DISPLAY_ATTRIBUTES
+        }
+        # only the colors of drawn layers affect the plot
+        attributes["colors"] = list(attributes["colors"][: len(build)])
+
+        normalized = json.dumps(
+            {
+                "version": CACHE_VERSION,
+                "matplotlib": matplotlib.__version__,
+                "build": build,
+                "attributes": attributes,
+                "format": file_format,
+                "dpi": dpi,
+            },
+            sort_keys=True,
+            default=_to_json,
+        )
+
+        return hashlib.sha256(normalized.encode()).hexdigest()
+
+    def get_path(self, key, extension=".png"):
+        return os.path.join(self.directory, f"{key}{extension}")
+
+    def fetch(self, key, plot_file):
+        """
+        Copy or link a cached plot to plot_file, if it is in the cache.
+
+        Arguments:
+            key (str): cache key of the plot
+            plot_file (str): path to write the plot to, its extension is the
+                extension of the cached file
+
+        Returns:
+            hit (bool): True if the plot was in the cache
+        """
+        path = self.get_path(key, os.path.splitext(plot_file)[1])
+        if not os.path.exists(path):
+            return False
+
+        if os.path.lexists(plot_file):
+            os.remove(plot_file)
+        try:
+            if not self.hard_link:
+                raise OSError
+            os.link(path, plot_file)
+        except OSError:
+            try:
+                shutil.copyfile(path, plot_file)
+            except FileNotFoundError:
+                # evicted by another process since the check above
+                return False
+
+        # mark the entry as recently used
+        os.utime(path)
+        return True
+
+    def store(self, key, plot_file):
+        """
+        Add a rendered plot to the cache, then evict least recently used
+        entries until the cache fits in max_bytes.
+
+        Arguments:
+            key (str): cache key of the plot
+            plot_file (str): path of the rendered plot
+        """
+        # write to a temporary file first so other processes never read a
+        # partially copied plot
+        file_descriptor, temp_path = tempfile.mkstemp(
+            dir=self.directory, suffix=".tmp"
+        )
+        os.close(file_descriptor)
+        shutil.copyfile(plot_file, temp_path)
+        os.replace(
+            temp_path, self.get_path(key, os.path.splitext(plot_file)[1])
+        )
+
+        self.evict()
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits in max_bytes
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(CACHE_EXTENSIONS):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+
+    def clear(self):
+        """
+        Remove every entry from the cache
+        """
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(CACHE_EXTENSIONS + (".tmp",)):
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
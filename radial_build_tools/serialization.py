@@ -0,0 +1,127 @@
+import json
+
+import yaml
+
+# the libyaml bindings are several times faster than the pure python ones
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+SafeDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# file extensions read as JSON by read_build_file, anything else is YAML
+JSON_EXTENSIONS = (".json",)
+
+
+def to_builtin(value):
+    """
+    Recursively convert numpy arrays and scalars to python lists and scalars,
+    so that they can be written with the safe YAML dumper.
+
+    Arguments:
+        value: dict, list, tuple, numpy array or scalar to convert
+
+    Returns:
+        value: the value built only from dicts, lists and python scalars
+    """
+    if isinstance(value, dict):
+        return {key: to_builtin(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_builtin(item) for item in value]
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return value
+
+
+def read_yaml(filename):
+    """Reads yaml file to extract title and build variables"""
+    with open(filename) as file:
+        data = yaml.load(file, Loader=SafeLoader)
+
+    return data
+
+
+def write_yaml(data, filename):
+    """
+    Write a dict to a YAML file, converting numpy values to lists and
+    scalars.
+
+    Arguments:
+        data (dict): data to write
+        filename (str): path of the YAML file
+    """
+    with open(filename, "w") as file:
+        yaml.dump(
+            to_builtin(data),
+            file,
+            Dumper=SafeDumper,
+            default_flow_style=False,
+            sort_keys=False,
+        )
+
+
+def _encode_array(value):
+    """Encode numpy arrays and scalars for json.dump"""
+    if hasattr(value, "shape") and value.shape != ():
+        return {
+            "__ndarray__": value.ravel().tolist(),
+            "dtype": value.dtype.str,
+            "shape": list(value.shape),
+        }
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value)} is not JSON serializable")
+
+
+def _decode_array(obj):
+    """Decode numpy arrays written by _encode_array for json.load"""
+    if "__ndarray__" not in obj:
+        return obj
+
+    import numpy as np
+
+    return np.array(obj["__ndarray__"], dtype=obj["dtype"]).reshape(
+        obj["shape"]
+    )
+
+
+def read_json(filename):
+    """
+    Read a dict from a compact JSON file written by write_json. Arrays are
+    restored as numpy arrays with their original dtype and shape.
+
+    Arguments:
+        filename (str): path of the JSON file
+
+    Returns:
+        data (dict): data read from the file
+    """
+    with open(filename) as file:
+        return json.load(file, object_hook=_decode_array)
+
+
+def write_json(data, filename):
+    """
+    Write a dict to a compact JSON file. Numpy arrays, such as parastell
+    thickness matrices, are stored with their dtype and shape, which is much
+    faster to read and write than YAML for large arrays.
+
+    Arguments:
+        data (dict): data to write
+        filename (str): path of the JSON file
+    """
+    with open(filename, "w") as file:
+        json.dump(data, file, default=_encode_array, separators=(",", ":"))
+
+
+def read_build_file(filename):
+    """
+    Read a radial build plot definition from a YAML or JSON file, chosen by
+    the file extension.
+
+    Arguments:
+        filename (str): path of the file
+
+    Returns:
+        data (dict): keyword arguments for RadialBuildPlot
+    """
+    if filename.endswith(JSON_EXTENSIONS):
+        return read_json(filename)
+    return read_yaml(filename)
@@ -0,0 +1,1551 @@
+import itertools
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import openmc
+from openmc.mixin import IDWarning
+
+from .build import RadialBuild, _torus_volume
+from .profiling import profiled
+
+# composition entries left out of mixtures, diluting the other materials
+VOID_MATERIALS = ("Void", "Vacuum")
+# decimal places of the volume fractions of mixture materials
+MIXTURE_FRACTION_DIGITS = 6
+
+
+class ToroidalModel(object):
+    """
+    An object that uses a radial build definition generate OpenMC models
+    with toroidal geometry.
+
+    Parameters
+        build (RadialBuild or dict): radial build, or a dict in the format
+            below, which is converted to a RadialBuild. The build is never
+            modified, so it can be shared between models.
+            {"layer name": {
+                            "thickness": (float),
+                            "composition": {
+                                "material name": fraction (float)
+                                },
+                            "material_name": (str) name of material in
+                                associated OpenMC material library. To have a
+                                layer with vacuum/void do not include the
+                                'material_name' or 'composition' keys.
+                    }
+                }
+            Layers with a "composition" but no "material_name" are void,
+            unless mix_compositions is True.
+            The dict corresponding to each "layer_name" key may be empty,
+            or have any combination of entries. Layers may define a
+            "thickness_matrix" (numpy array) of thicknesses on the phi_list,
+            theta_list grid instead of a "thickness", in which case the
+            model is partitioned into sectors, see build_sectors.
+        major_rad (float): major radius of the torus
+        minor_rad_z (float): minor radius of the plasma region parallel to the
+            z axis
+        minor_rad_xy (float): minor radius of the plasma region perpendicular
+            to the z axis
+        materials (str or OpenMC Materials object): path to the OpenMC materials
+            xml file for this model, or the corresponding Materials OpenMC
+            object
+        bounding_surface (str): vacuum boundary around the model, "sphere"
+            for the smallest sphere centered on the origin containing the
+            outermost layer, or "cylinder" for a z-cylinder capped by planes
+            fit to the outermost layer
+        phi_list (iter of float): toroidal angles, in degrees, of the
+            thickness matrix grid
+        theta_list (iter of float): poloidal angles, in degrees, of the
+            thickness matrix grid, measured from the outboard midplane
+            towards +z
+        sector_tolerance (float): adjacent grid points are merged into one
+            sector while all of their layer thicknesses are within this
+            tolerance
+        mix_compositions (bool): if True, layers with a "composition" but no
+            "material_name" are filled with a mixture of the library
+            materials named in the composition, by volume fraction, see
+            get_mixture. Every material in those compositions must then be
+            in the library.
+        mixtures (dict): Optional, cache of mixture materials made from
+            layer compositions, see get_mixture. Pass the same dict to
+            models using the same material library to share mixtures
+            between them.
+        simplify (bool): if True, adjacent nonzero thickness layers with the
+            same material, or both void, are fused into one cell bounded by
+            one pair of ZTorus surfaces, see get_layer_groups. cell_dict
+            maps each original layer name to its fused cell, and
+            simplification reports what was removed.
+    """
+
+    def __init__(
+        self,
+        build,
+        major_rad,
+        minor_rad_z,
+        minor_rad_xy,
+        materials,
+        bounding_surface="sphere",
+        phi_list=None,
+        theta_list=None,
+        sector_tolerance=0.0,
+        mix_compositions=False,
+        mixtures=None,
+        simplify=False,
+    ):
+        if not isinstance(build, RadialBuild):
+            build = RadialBuild.from_dict(build)
+        for name, thickness, matrix in zip(
+            build.names, build.thicknesses, build.thickness_matrices
+        ):
+            if matrix is None and np.isnan(thickness):
+                raise ValueError(
+                    f"layer {name} has no thickness or thickness matrix"
+                )
+        if build.sectorized:
+            if phi_list is None or theta_list is None:
+                raise ValueError(
+                    "phi_list and theta_list are required for builds with "
+                    "thickness matrices"
+                )
+            grid_shape = (np.size(phi_list), np.size(theta_list))
+            for name, matrix in zip(build.names, build.thickness_matrices):
+                if matrix is not None and matrix.shape != grid_shape:
+                    raise ValueError(
+                        f"thickness matrix of layer {name} has shape "
+                        f"{matrix.shape}, phi_list and theta_list have "
+                        f"shape {grid_shape}"
+                    )
+        self.build = build
+        self.bounding_surface = bounding_surface
+        self.phi_list = phi_list
+        self.theta_list = theta_list
+        self.sector_tolerance = sector_tolerance
+        self.simplify = simplify
+        self.sectorized = build.sectorized
+        self.major_rad = major_rad
+        self.minor_rad_z = minor_rad_z
+        self.minor_rad_xy = minor_rad_xy
+        if isinstance(materials, str):
+            self.input_materials, self.material_index = load_material_library(
+                materials
+            )
+        else:
+            self.input_materials = materials
+            self.material_index = index_materials(materials)
+        self.mix_compositions = mix_compositions
+        self.mixtures = {} if mixtures is None else mixtures
+
+        self.assign_materials()
+
+    @profiled
+    def assign_materials(self):
+        """
+        Look up the OpenMC material object of each layer in the build, or mix
+        it from the layer composition if mix_compositions is True, None for
+        void layers, and store them in layer_materials in build order.
+        """
+        self.layer_materials = [
+            (
+                self.get_material_by_name(name)
+                if name is not None
+                else (
+                    self.get_mixture(composition)
+                    if self.mix_compositions
+                    else None
+                )
+            )
+            for name, composition in zip(
+                self.build.material_names, self.build.compositions
+            )
+        ]
+
+    def clone_materials(self):
+        """
+        Clone the materials of the layers for this model, and store them in
+        cell_materials in build order, None for void layers. Cells are filled
+        with the clones, which hold the volumes set by set_volumes, so
+        library materials and mixtures shared with other models are never
+        modified. material_sources maps the id() of each clone to the
+        material it was cloned from.
+        """
+        clones = {}
+        self.material_sources = {}
+        for material in self.layer_materials:
+            if material is not None and id(material) not in clones:
+                clone = material.clone()
+                clones[id(material)] = clone
+                self.material_sources[id(clone)] = material
+
+        self.cell_materials = [
+            None if material is None else clones[id(material)]
+            for material in self.layer_materials
+        ]
+
+    def get_mixture(self, composition):
+        """
+        Get the material mixing the library materials of a layer composition
+        by volume fraction, with openmc.Material.mix_materials. Entries
+        named in VOID_MATERIALS are left out, so fractions summing to less
+        than one dilute the mixture. Mixtures are cached in mixtures on the
+        sorted material names and fractions rounded to
+        MIXTURE_FRACTION_DIGITS, so layers with the same composition share
+        one material.
+
+        Arguments:
+            composition (dict or iter of tuple): material name (str) mapped
+                to its volume fraction (float), or None
+
+        Returns:
+            mixture (OpenMC material object): mixed material, the library
+                material itself for a composition of one material with
+                fraction 1, or None if the composition is void
+        """
+        if composition is None:
+            return None
+        fractions = {}
+        for name, fraction in dict(composition).items():
+            if name not in VOID_MATERIALS:
+                fractions[name] = fractions.get(name, 0.0) + fraction
+        key = tuple(
+            sorted(
+                (name, round(fraction, MIXTURE_FRACTION_DIGITS))
+                for name, fraction in fractions.items()
+                if fraction != 0
+            )
+        )
+        if not key:
+            return None
+
+        if key not in self.mixtures:
+            if len(key) == 1 and key[0][1] == 1:
+                mixture = self.get_material_by_name(key[0][0])
+            else:
+                mixture = openmc.Material.mix_materials(
+                    [self.get_material_by_name(name) for name, _ in key],
+                    [fraction for _, fraction in key],
+                    "vo",
+                    name="mix("
+                    + ", ".join(f"{name} {fraction}" for name, fraction in key)
+                    + ")",
+                )
+            self.mixtures[key] = mixture
+
+        return self.mixtures[key]
+
+    def classify_points(self, points):
+        """
+        Find the layer containing each point without using OpenMC, see
+        RadialBuild.classify_points.
+
+        Arguments:
+            points (numpy array): (N, 3) array of x, y, z coordinates
+
+        Returns:
+            layer_indices (numpy array): (N,) array of the index in
+                build.names of the layer containing each point, -1 for
+                points in the plasma and len(build) for points outside the
+                build
+        """
+        return self.build.classify_points(
+            points, self.major_rad, self.minor_rad_z, self.minor_rad_xy
+        )
+
+    def get_material_by_name(self, material_name):
+        """
+        Look up the material with a matching name in the material library
+        index.
+
+        Arguments:
+            material_name (string): name of material to be returned
+
+        Returns:
+            mat (OpenMC material object): material object with matching name
+        """
+        if material_name in self.material_index:
+            return self.material_index[material_name]
+        # if this returns none, openmc will just assign vacuum to any cell
+        # using this material
+        raise ValueError(
+            f"no material name {material_name} was found in the library"
+        )
+
+    def get_layer_groups(self, thicknesses):
+        """
+        Group the layers with nonzero thickness into the shells built as one
+        cell each. Every layer is its own group, unless simplify is True, in
+        which case runs of adjacent layers with the same material, or all
+        void, are grouped. Layers with zero thickness are skipped, so the
+        layers on either side of them are adjacent.
+
+        Arguments:
+            thicknesses (iter of float): thickness of each layer in build
+                order
+
+        Returns:
+            groups (list of list of int): indices of the layers in each
+                group, in build order
+        """
+        groups = []
+        for index in np.flatnonzero(np.asarray(thicknesses) != 0).tolist():
+            if (
+                self.simplify
+                and groups
+                and self.layer_materials[index]
+                is self.layer_materials[groups[-1][-1]]
+            ):
+                groups[-1].append(index)
+            else:
+                groups.append([index])
+
+        return groups
+
+    @profiled
+    def build_surfaces(self):
+        """
+        Build the surfaces representing the radial build using OpenMC CSG.
+        Each group of layers from get_layer_groups is bounded by the surface
+        named after its last layer.
+        """
+        major_rad = self.major_rad
+        minor_rad_z = self.minor_rad_z
+        minor_rad_xy = self.minor_rad_xy
+        # build surfaces
+        surfaces = {}
+
+        surfaces["plasma_surface"] = openmc.ZTorus(
+            a=major_rad, b=minor_rad_z, c=minor_rad_xy
+        )
+
+        self.layer_groups = self.get_layer_groups(self.build.thicknesses)
+        radii = self.build.radii.tolist()
+        for group in self.layer_groups:
+            radius = radii[group[-1]]
+            surfaces[self.build.names[group[-1]]] = openmc.ZTorus(
+                a=major_rad, b=minor_rad_z + radius, c=minor_rad_xy + radius
+            )
+
+        self.surfaces = surfaces
+
+    @profiled
+    def build_regions(self):
+        """
+        Build OpenMC regions from the surfaces defined by the build dict
+        """
+        # build regions
+        regions = {}
+
+        regions["plasma"] = -self.surfaces["plasma_surface"]
+
+        surf_list = list(self.surfaces.keys())
+
+        for inner_surf, outer_surf in zip(surf_list[0:-1], surf_list[1:]):
+            regions[outer_surf] = (
+                -self.surfaces[outer_surf] & +self.surfaces[inner_surf]
+            )
+
+        self.regions = regions
+        self.surf_list = surf_list
+        self.outer_surfaces = [self.surfaces[surf_list[-1]]]
+        self.outer_region = +self.surfaces[surf_list[-1]]
+
+    @profiled
+    def build_cells(self):
+        """
+        Build OpenMC cells from the regions defined by the build dict. Each
+        group of layers from get_layer_groups becomes one cell, named after
+        its layers joined by "+", and cell_dict maps each layer name to its
+        cell. simplification records the number of surfaces and cells
+        removed by fusing layers, and the layers of each fused cell.
+        """
+        # build cells
+        cell_dict = {}
+        # dict keys keep the materials unique and in build order
+        materials = {}
+
+        cell_dict["plasma_cell"] = openmc.Cell(
+            region=self.regions["plasma"], name="plasma_cell"
+        )
+        # cell mapped to its (inner torus, outer torus, phi wedges, theta
+        # wedge), for set_volumes
+        cell_shells = {
+            cell_dict["plasma_cell"]: (
+                None,
+                self.surfaces["plasma_surface"],
+                None,
+                None,
+            )
+        }
+        merged_cells = {}
+
+        inner_surface = self.surfaces["plasma_surface"]
+        for group in self.layer_groups:
+            layers = [self.build.names[index] for index in group]
+            material = self.cell_materials[group[0]]
+            cell = openmc.Cell(
+                region=self.regions[layers[-1]],
+                name="+".join(layers),
+                fill=material,
+            )
+            for layer in layers:
+                cell_dict[layer] = cell
+            if len(layers) > 1:
+                merged_cells[cell.name] = layers
+            materials[material] = None
+            cell_shells[cell] = (
+                inner_surface,
+                self.surfaces[layers[-1]],
+                None,
+                None,
+            )
+            inner_surface = self.surfaces[layers[-1]]
+
+        num_removed = sum(len(group) - 1 for group in self.layer_groups)
+        self.simplification = {
+            "surfaces_removed": num_removed,
+            "cells_removed": num_removed,
+            "merged_cells": merged_cells,
+        }
+        self.cell_list = list(cell_shells)
+        self.cell_dict = cell_dict
+        self.cell_shells = cell_shells
+        self.materials = openmc.Materials(
+            [mat for mat in materials if mat is not None]
+        )
+
+    @profiled
+    def build_sectors(self):
+        """
+        Partition the torus into toroidal and poloidal sectors using the
+        layer thickness matrices. Adjacent grid points are merged into one
+        sector while all of their layer thicknesses are within
+        sector_tolerance, and each sector uses the mean layer thicknesses of
+        its grid points. Each grid point covers the angles up to halfway to
+        its neighbours.
+
+        The phi grid is taken to span one period of the build, which is
+        repeated around the torus, so its span must divide 360 degrees, and
+        the theta grid the full poloidal circle. The last phi grid point,
+        and the last theta grid point if it is 360 degrees from the first,
+        are dropped as duplicates of the first.
+        """
+        phi_list = np.asarray(self.phi_list, dtype=float)
+        theta_list = np.asarray(self.theta_list, dtype=float)
+        grid_shape = (phi_list.size, theta_list.size)
+        thicknesses = np.stack(
+            [
+                np.broadcast_to(
+                    thickness if matrix is None else matrix, grid_shape
+                )
+                for thickness, matrix in zip(
+                    self.build.thicknesses, self.build.thickness_matrices
+                )
+            ]
+        )
+
+        phi_period = 360.0
+        num_periods = 1
+        if phi_list.size > 1:
+            phi_period = phi_list[-1] - phi_list[0]
+            num_periods = round(360.0 / phi_period)
+            if not np.isclose(num_periods * phi_period, 360.0):
+                raise ValueError(
+                    "the span of phi_list must divide 360 degrees"
+                )
+            phi_list = phi_list[:-1]
+            thicknesses = thicknesses[:, :-1, :]
+
+        if theta_list.size > 1 and np.isclose(
+            theta_list[-1] - theta_list[0], 360.0
+        ):
+            theta_list = theta_list[:-1]
+            thicknesses = thicknesses[:, :, :-1]
+
+        phi_bounds = _periodic_bounds(phi_list, phi_period)
+        theta_bounds = _periodic_bounds(theta_list, 360.0)
+
+        sectors = []
+        for phi_start, phi_stop in _merge_runs(
+            thicknesses.transpose(1, 0, 2), self.sector_tolerance
+        ):
+            # sectors covering the whole torus need no bounding surfaces
+            phi_wedges = None
+            if phi_stop - phi_start < phi_list.size:
+                phi_wedges = [
+                    (
+                        phi_bounds[phi_start] + period * phi_period,
+                        phi_bounds[phi_stop] + period * phi_period,
+                    )
+                    for period in range(num_periods)
+                ]
+
+            phi_block = thicknesses[:, phi_start:phi_stop, :]
+            for theta_start, theta_stop in _merge_runs(
+                phi_block.transpose(2, 0, 1), self.sector_tolerance
+            ):
+                theta_wedge = None
+                if theta_stop - theta_start < theta_list.size:
+                    theta_wedge = (
+                        theta_bounds[theta_start],
+                        theta_bounds[theta_stop],
+                    )
+
+                sectors.append(
+                    {
+                        "phi": phi_wedges,
+                        "theta": theta_wedge,
+                        "thicknesses": phi_block[
+                            :, :, theta_start:theta_stop
+                        ].mean(axis=(1, 2)),
+                    }
+                )
+
+        self.sectors = sectors
+
+    @profiled
+    def build_sector_cells(self):
+        """
+        Build OpenMC surfaces, regions and cells for each sector of a build
+        with varying thickness. Cells are named "<layer name>_<sector
+        index>", and layer_cells maps each layer name to its cells. With
+        simplify, the layers of a sector are grouped by get_layer_groups and
+        fused cells are named "<layer name>+<layer name>_<sector index>".
+        ZTorus surfaces with the same radii and sector boundary surfaces are
+        shared between sectors.
+        """
+        tori = {}
+        half_spaces = {}
+        # tori that would bound the layers of every sector without simplify
+        unsimplified_tori = set()
+
+        def torus_key(minor_rad_z, minor_rad_xy):
+            return (round(minor_rad_z, 9), round(minor_rad_xy, 9))
+
+        def get_torus(minor_rad_z, minor_rad_xy):
+            key = torus_key(minor_rad_z, minor_rad_xy)
+            if key not in tori:
+                tori[key] = openmc.ZTorus(
+                    a=self.major_rad, b=minor_rad_z, c=minor_rad_xy
+                )
+            return tori[key]
+
+        def get_wedge(angle_kind, start, stop):
+            for angle in (start, stop):
+                key = (angle_kind, round(angle % 360.0, 9))
+                if key in half_spaces:
+                    continue
+                if angle_kind == "phi":
+                    half_spaces[key] = _toroidal_half_spaces(angle)
+                else:
+                    half_spaces[key] = _poloidal_half_spaces(
+                        angle, self.major_rad
+                    )
+            left = half_spaces[(angle_kind, round(start % 360.0, 9))][0]
+            right = half_spaces[(angle_kind, round(stop % 360.0, 9))][1]
+            if stop - start <= 180.0:
+                return left & right
+            return left | right
+
+        plasma_surface = get_torus(self.minor_rad_z, self.minor_rad_xy)
+        cell_dict = {
+            "plasma_cell": openmc.Cell(
+                region=-plasma_surface, name="plasma_cell"
+            )
+        }
+        cell_shells = {
+            cell_dict["plasma_cell"]: (None, plasma_surface, None, None)
+        }
+        layer_cells = {layer: [] for layer in self.build.names}
+        merged_cells = {}
+        num_cells_removed = 0
+        materials = {}
+        outer_surfaces = []
+        outer_regions = []
+
+        for index, sector in enumerate(self.sectors):
+            sector_region = None
+            if sector["phi"] is not None:
+                wedges = [get_wedge("phi", *wedge) for wedge in sector["phi"]]
+                sector_region = (
+                    wedges[0] if len(wedges) == 1 else openmc.Union(wedges)
+                )
+            if sector["theta"] is not None:
+                theta_region = get_wedge("theta", *sector["theta"])
+                sector_region = (
+                    theta_region
+                    if sector_region is None
+                    else sector_region & theta_region
+                )
+
+            radii = np.cumsum(sector["thicknesses"]).tolist()
+            groups = self.get_layer_groups(sector["thicknesses"])
+            inner_surface = plasma_surface
+            for group in groups:
+                for layer_index in group:
+                    unsimplified_tori.add(
+                        torus_key(
+                            self.minor_rad_z + radii[layer_index],
+                            self.minor_rad_xy + radii[layer_index],
+                        )
+                    )
+                radius = radii[group[-1]]
+                outer_surface = get_torus(
+                    self.minor_rad_z + radius, self.minor_rad_xy + radius
+                )
+
+                layers = [self.build.names[layer] for layer in group]
+                material = self.cell_materials[group[0]]
+                region = -outer_surface & +inner_surface
+                if sector_region is not None:
+                    region = sector_region & region
+                cell = openmc.Cell(
+                    region=region,
+                    name=f"{'+'.join(layers)}_{index}",
+                    fill=material,
+                )
+                for layer in layers:
+                    cell_dict[f"{layer}_{index}"] = cell
+                    layer_cells[layer].append(cell)
+                if len(layers) > 1:
+                    merged_cells[cell.name] = layers
+                    num_cells_removed += len(layers) - 1
+                cell_shells[cell] = (
+                    inner_surface,
+                    outer_surface,
+                    sector["phi"],
+                    sector["theta"],
+                )
+                materials[material] = None
+
+                inner_surface = outer_surface
+
+            outer_surfaces.append(inner_surface)
+            outer_regions.append(
+                +inner_surface
+                if sector_region is None
+                else sector_region & +inner_surface
+            )
+
+        self.surfaces = {"plasma_surface": plasma_surface}
+        for surface in tori.values():
+            if surface is not plasma_surface:
+                self.surfaces[f"torus_{surface.id}"] = surface
+        self.outer_surfaces = outer_surfaces
+        self.outer_region = (
+            outer_regions[0]
+            if len(outer_regions) == 1
+            else openmc.Union(outer_regions)
+        )
+        unsimplified_tori.add(torus_key(self.minor_rad_z, self.minor_rad_xy))
+        self.simplification = {
+            "surfaces_removed": len(unsimplified_tori) - len(tori),
+            "cells_removed": num_cells_removed,
+            "merged_cells": merged_cells,
+        }
+        self.cell_list = list(cell_shells)
+        self.cell_dict = cell_dict
+        self.cell_shells = cell_shells
+        self.layer_cells = layer_cells
+        self.materials = openmc.Materials(
+            [mat for mat in materials if mat is not None]
+        )
+
+    @profiled
+    def get_bounded_geometry(self):
+        """
+        Get an OpenMC geometry instances containing all cells, plus a bounding
+        vacuum cell. The bounding surface is fit tightly around the outermost
+        layer, computed directly from its ZTorus coefficients.
+        """
+        if self.bounding_surface == "sphere":
+            sphere = openmc.Sphere(boundary_type="vacuum")
+            self.bounding_surfaces = {"sphere": sphere}
+            bounding_region = -sphere
+        elif self.bounding_surface == "cylinder":
+            cylinder = openmc.ZCylinder(boundary_type="vacuum")
+            bottom = openmc.ZPlane(boundary_type="vacuum")
+            top = openmc.ZPlane(boundary_type="vacuum")
+            self.bounding_surfaces = {
+                "cylinder": cylinder,
+                "bottom": bottom,
+                "top": top,
+            }
+            bounding_region = -cylinder & +bottom & -top
+        else:
+            raise ValueError(
+                f"bounding surface {self.bounding_surface} is not supported, "
+                'use "sphere" or "cylinder"'
+            )
+        self.update_bounding_surfaces()
+
+        vac_region = bounding_region & self.outer_region
+        vac_cell = openmc.Cell(region=vac_region, name="vac_cell")
+
+        self.cell_list.append(vac_cell)
+        self.cell_dict["vac_cell"] = vac_cell
+
+        self.geometry = openmc.Geometry(self.cell_list)
+
+    def update_bounding_surfaces(self):
+        """
+        Fit the bounding surfaces to the current outermost ZTorus surfaces
+        """
+        if self.bounding_surface == "sphere":
+            self.bounding_surfaces["sphere"].r = max(
+                _bounding_sphere_radius(surface.a, surface.b, surface.c)
+                for surface in self.outer_surfaces
+            )
+        else:
+            self.bounding_surfaces["cylinder"].r = max(
+                surface.a + surface.c for surface in self.outer_surfaces
+            )
+            minor_rad_z = max(surface.b for surface in self.outer_surfaces)
+            self.bounding_surfaces["bottom"].z0 = -minor_rad_z
+            self.bounding_surfaces["top"].z0 = minor_rad_z
+
+    @profiled
+    def set_volumes(self):
+        """
+        Compute the exact volume of the plasma and layer cells from the
+        closed form volumes of the ZTorus surfaces and sector wedges bounding
+        them, and set Cell.volume, and Material.volume to the total volume
+        of the cells filled with each material, so OpenMC needs no
+        stochastic volume calculation. Volumes are set on this model's clones
+        of the materials, see clone_materials. Called whenever the model is
+        built or its surfaces are updated. The vacuum cell's volume is not
+        set. Sector cells bounded by tori reaching the z axis have no closed
+        form volume, so their volume, and that of their material, is set to
+        None with a warning.
+
+        Returns:
+            volumes (dict): cell name mapped to its volume, in cm^3, or None.
+                Cells of a sectorized layer can be summed using layer_cells.
+        """
+        volumes = {}
+        material_volumes = {}
+        unknown = []
+        for cell, (
+            inner,
+            outer,
+            phi_wedges,
+            theta_wedge,
+        ) in self.cell_shells.items():
+            phi_span = 360.0
+            if phi_wedges is not None:
+                phi_span = sum(stop - start for start, stop in phi_wedges)
+            volume = 0.0
+            for surface, sign in ((outer, 1), (inner, -1)):
+                if surface is not None:
+                    volume += sign * float(
+                        _torus_volume(
+                            surface.a,
+                            surface.b,
+                            surface.c,
+                            theta_wedge,
+                            phi_span,
+                        )
+                    )
+
+            if cell.fill is not None:
+                material_volumes[cell.fill] = (
+                    material_volumes.get(cell.fill, 0.0) + volume
+                )
+            if np.isnan(volume):
+                unknown.append(cell.name)
+                volume = None
+            cell.volume = volume
+            volumes[cell.name] = volume
+
+        for material, volume in material_volumes.items():
+            material.volume = None if np.isnan(volume) else volume
+
+        if unknown:
+            warnings.warn(
+                f"volumes of cells {unknown} are not set, their tori reach "
+                "the z axis"
+            )
+
+        return volumes
+
+    def get_masses(self):
+        """
+        Get the mass of each cell filled with a material, from the exact
+        cell volumes and the mass density of the material.
+
+        Returns:
+            masses (dict): cell name mapped to its mass, in grams, or None
+                if its volume is not set, see set_volumes
+        """
+        if not hasattr(self, "geometry"):
+            self.build_openmc_model()
+
+        return {
+            cell.name: (
+                None
+                if cell.volume is None
+                else cell.volume * cell.fill.get_mass_density()
+            )
+            for cell in self.cell_shells
+            if cell.fill is not None
+        }
+
+    def build_openmc_model(self):
+        """
+        Builds openmc model using the build definition
+        """
+        self.clone_materials()
+        if self.sectorized:
+            self.build_sectors()
+            self.build_sector_cells()
+        else:
+            self.build_surfaces()
+            self.build_regions()
+            self.build_cells()
+        self.get_bounded_geometry()
+        self.set_volumes()
+        self.assign_ids()
+
+    def assign_ids(self):
+        """
+        Number the cells and surfaces of the built geometry from 1 in build
+        order, and the materials that are not in the material library from
+        one past the largest library material ID, so the same build always
+        exports the same IDs, whatever OpenMC objects were created before
+        it. Clones of library materials keep the IDs of the library
+        materials. Called whenever the model is built.
+        """
+        library = {id(material) for material in self.input_materials}
+        material_id = max(
+            [material.id for material in self.input_materials], default=0
+        )
+        surfaces = {}
+        for cell in self.cell_list:
+            _region_surfaces(cell.region, surfaces)
+
+        # IDs only need to be unique within the exported model, so reusing
+        # the IDs of OpenMC objects outside of it is not reported
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", IDWarning)
+            self.geometry.root_universe.id = 1
+            for cell_id, cell in enumerate(self.cell_list, start=1):
+                cell.id = cell_id
+            for surface_id, surface in enumerate(surfaces.values(), start=1):
+                surface.id = surface_id
+            for material in self.materials:
+                source = self.material_sources[id(material)]
+                if id(source) in library:
+                    material.id = source.id
+                else:
+                    material_id += 1
+                    material.id = material_id
+
+    def get_openmc_model(self):
+        """
+        Return toroidal model built using the build definition, contains
+        geometry and material information
+
+        Returns:
+            model (openmc model): Model containing materials and geometry
+                from the build dict.
+            cells (dict): dict mapping layer names to openmc cell instances in
+                the model object returned by this function.
+        """
+        self.build_openmc_model()
+        model = openmc.Model(geometry=self.geometry, materials=self.materials)
+        return model, self.cell_dict
+
+    def get_bounding_box(self):
+        """
+        Get the axis-aligned box containing the bounding surfaces of the
+        model. Requires the model to have been built.
+
+        Returns:
+            lower_left (numpy array): lower left corner of the box
+            upper_right (numpy array): upper right corner of the box
+        """
+        if self.bounding_surface == "sphere":
+            radius = self.bounding_surfaces["sphere"].r
+            return np.full(3, -radius), np.full(3, radius)
+
+        radius = self.bounding_surfaces["cylinder"].r
+        return (
+            np.array([-radius, -radius, self.bounding_surfaces["bottom"].z0]),
+            np.array([radius, radius, self.bounding_surfaces["top"].z0]),
+        )
+
+    def get_complexity_report(self, num_samples=1000, seed=None):
+        """
+        Report the size of the built OpenMC geometry and estimate the relative
+        cost of tracking through it. Cost is estimated by timing
+        Geometry.find on points sampled uniformly in the bounding box, which
+        is done in Python, so times are only meaningful relative to other
+        models measured the same way.
+
+        Arguments:
+            num_samples (int): number of points to sample, if 0 no timing
+                is done
+            seed (int): Optional, seed for the random point sampler
+
+        Returns:
+            report (dict): {
+                "num_surfaces": (int) number of surfaces in the geometry,
+                "num_cells": (int) number of cells in the geometry,
+                "num_samples": (int) number of sampled points,
+                "mean_find_time": (float) mean seconds per Geometry.find,
+                "cells": {"cell name": {
+                    "operators": (int) number of &, | and ~ operators in
+                        the cell region,
+                    "depth": (int) depth of the region expression,
+                    "surfaces": (int) number of surfaces bounding the cell,
+                    "sample_fraction": (float) fraction of sampled points
+                        found in the cell,
+                    "mean_find_time": (float) mean seconds per
+                        Geometry.find for points found in the cell,
+                    }
+                }
+            }
+        """
+        if not hasattr(self, "geometry"):
+            self.build_openmc_model()
+
+        cells = {}
+        for cell in self.cell_list:
+            operators, depth, surfaces = _region_complexity(cell.region)
+            cells[cell.name] = {
+                "operators": operators,
+                "depth": depth,
+                "surfaces": len(surfaces),
+                "sample_fraction": 0.0,
+                "mean_find_time": 0.0,
+            }
+
+        find_times = []
+        if num_samples > 0:
+            lower_left, upper_right = self.get_bounding_box()
+            points = np.random.default_rng(seed).uniform(
+                lower_left, upper_right, (num_samples, 3)
+            )
+            for point in points:
+                start = time.perf_counter()
+                path = self.geometry.find(point)
+                find_time = time.perf_counter() - start
+                find_times.append(find_time)
+                # points outside the bounding surface are found in no cell
+                if path and path[-1].name in cells:
+                    cell_report = cells[path[-1].name]
+                    cell_report["sample_fraction"] += 1
+                    cell_report["mean_find_time"] += find_time
+
+            for cell_report in cells.values():
+                if cell_report["sample_fraction"] > 0:
+                    cell_report["mean_find_time"] /= cell_report[
+                        "sample_fraction"
+                    ]
+                cell_report["sample_fraction"] /= num_samples
+
+        return {
+            "num_surfaces": len(self.geometry.get_all_surfaces()),
+            "num_cells": len(self.geometry.get_all_cells()),
+            "num_samples": num_samples,
+            "mean_find_time": np.mean(find_times) if find_times else 0.0,
+            "cells": cells,
+        }
+
+    @classmethod
+    def from_parastell_build(
+        cls,
+        parastell_build_dict,
+        major_rad,
+        minor_rad_z,
+        minor_rad_xy,
+        materials,
+        material_names=None,
+        **kwargs,
+    ):
+        """
+        Create a toroidal model with varying layer thickness from a parastell
+        build.
+
+        Arguments:
+            parastell_build_dict (dict): parastell build dict, containing
+                "phi_list", "theta_list" and "radial_build"
+            major_rad, minor_rad_z, minor_rad_xy, materials: see ToroidalModel
+            material_names (dict): Optional, maps h5m tags (str) to names of
+                materials in the material library, or to None for void
+                layers. Tags that are not in the dict are used as material
+                names.
+            kwargs: optional ToroidalModel arguments, such as
+                sector_tolerance
+
+        Returns:
+            toroidal_model (ToroidalModel): model of the parastell build
+        """
+        if material_names is None:
+            material_names = {}
+
+        layers = parastell_build_dict["radial_build"]
+        h5m_tags = [layer["h5m_tag"] for layer in layers.values()]
+        build = RadialBuild(
+            layers.keys(),
+            np.full(len(layers), np.nan),
+            material_names=[
+                material_names.get(h5m_tag, h5m_tag) for h5m_tag in h5m_tags
+            ],
+            descriptions=h5m_tags,
+            thickness_matrices=[
+                layer["thickness_matrix"] for layer in layers.values()
+            ],
+        )
+
+        return cls(
+            build,
+            major_rad,
+            minor_rad_z,
+            minor_rad_xy,
+            materials,
+            phi_list=parastell_build_dict["phi_list"],
+            theta_list=parastell_build_dict["theta_list"],
+            **kwargs,
+        )
+
+    @profiled
+    def update_surfaces(
+        self, major_rad, minor_rad_z, minor_rad_xy, thicknesses
+    ):
+        """
+        Update the coefficients of the existing ZTorus surfaces and the
+        bounding surfaces in place, for a build with the same nonzero
+        thickness layers. Surfaces whose coefficients are unchanged are not
+        touched.
+
+        Arguments:
+            major_rad (float): major radius of the torus
+            minor_rad_z (float): minor radius of the plasma region parallel
+                to the z axis
+            minor_rad_xy (float): minor radius of the plasma region
+                perpendicular to the z axis
+            thicknesses (dict): layer name (str) mapped to the thickness of
+                the layer (float)
+        """
+        coefficients = {
+            "plasma_surface": (major_rad, minor_rad_z, minor_rad_xy)
+        }
+        # cumulative sums over every layer, as in build_surfaces, so
+        # restoring the base thicknesses gives identical coefficients
+        radii = dict(
+            zip(
+                self.build.names,
+                np.cumsum(
+                    [thicknesses[layer] for layer in self.build.names],
+                    dtype=float,
+                ).tolist(),
+            )
+        )
+        for layer in self.surf_list[1:]:
+            coefficients[layer] = (
+                major_rad,
+                minor_rad_z + radii[layer],
+                minor_rad_xy + radii[layer],
+            )
+
+        for name, (a, b, c) in coefficients.items():
+            surface = self.surfaces[name]
+            if (surface.a, surface.b, surface.c) != (a, b, c):
+                surface.a = a
+                surface.b = b
+                surface.c = c
+
+        self.update_bounding_surfaces()
+        self.set_volumes()
+
+    def sweep(self, overrides, export_dir=None):
+        """
+        Generate variants of this model with some parameters overridden. The
+        OpenMC model is built once, and for each variant only the ZTorus
+        coefficients that change and the bounding surfaces are updated, so
+        materials, regions and cells are shared between all variants. Each
+        model is only valid until the next one is generated, export it before
+        advancing the generator to keep it. The surfaces are restored to this
+        build when the generator finishes or is closed.
+
+        Arguments:
+            overrides (iter of dict): each dict maps parameter names to
+                values for one variant. Parameter names may be "major_rad",
+                "minor_rad_z", "minor_rad_xy" or the name of a layer in the
+                build, whose thickness is overridden. Overrides can't change
+                which layers have zero thickness.
+            export_dir (str): Optional, if given each variant is exported to
+                export_dir/<variant index>/model.xml
+
+        Yields:
+            params (dict): parameter overrides of the variant
+            model (openmc model): model of the variant
+            cells (dict): dict mapping layer names to openmc cell instances
+                in the model
+        """
+        if self.sectorized:
+            raise ValueError(
+                "sweeps are not supported for builds with thickness matrices"
+            )
+        if not hasattr(self, "geometry"):
+            self.build_openmc_model()
+
+        base_thicknesses = dict(
+            zip(self.build.names, self.build.thicknesses.tolist())
+        )
+        radii = ("major_rad", "minor_rad_z", "minor_rad_xy")
+
+        try:
+            for index, params in enumerate(overrides):
+                unknown = params.keys() - set(radii) - set(self.build.names)
+                if unknown:
+                    raise ValueError(f"unknown sweep parameters {unknown}")
+
+                thicknesses = {
+                    name: params.get(name, thickness)
+                    for name, thickness in base_thicknesses.items()
+                }
+                nonzero = [
+                    name
+                    for name, thickness in thicknesses.items()
+                    if thickness != 0
+                ]
+                if nonzero != [
+                    self.build.names[layer]
+                    for group in self.layer_groups
+                    for layer in group
+                ]:
+                    raise ValueError(
+                        "sweep overrides can't change which layers have zero "
+                        "thickness"
+                    )
+
+                self.update_surfaces(
+                    *[params.get(name, getattr(self, name)) for name in radii],
+                    thicknesses,
+                )
+                model = openmc.Model(
+                    geometry=self.geometry, materials=self.materials
+                )
+
+                if export_dir is not None:
+                    variant_dir = os.path.join(export_dir, str(index))
+                    os.makedirs(variant_dir, exist_ok=True)
+                    model.export_to_model_xml(
+                        os.path.join(variant_dir, "model.xml")
+                    )
+
+                yield params, model, self.cell_dict
+        finally:
+            self.update_surfaces(
+                self.major_rad,
+                self.minor_rad_z,
+                self.minor_rad_xy,
+                base_thicknesses,
+            )
+
+
+def _region_complexity(region):
+    """
+    Measure the size of an OpenMC region expression.
+
+    Arguments:
+        region (OpenMC region): region to measure
+
+    Returns:
+        operators (int): number of &, | and ~ operators in the expression
+        depth (int): depth of the expression, 1 for a single half-space
+        surfaces (set): ids of the surfaces in the expression
+    """
+    if isinstance(region, openmc.Halfspace):
+        return 0, 1, {region.surface.id}
+
+    if isinstance(region, openmc.Complement):
+        operators, depth, surfaces = _region_complexity(region.node)
+        return operators + 1, depth + 1, surfaces
+
+    operators = len(region) - 1
+    depth = 0
+    surfaces = set()
+    for node in region:
+        node_operators, node_depth, node_surfaces = _region_complexity(node)
+        operators += node_operators
+        depth = max(depth, node_depth)
+        surfaces |= node_surfaces
+
+    return operators, depth + 1, surfaces
+
+
+def _region_surfaces(region, surfaces):
+    """
+    Collect the surfaces of an OpenMC region expression in order of first
+    appearance.
+
+    Arguments:
+        region (OpenMC region): region to search
+        surfaces (dict): id() of each surface found so far mapped to the
+            surface, updated in place
+    """
+    if isinstance(region, openmc.Halfspace):
+        surfaces.setdefault(id(region.surface), region.surface)
+    elif isinstance(region, openmc.Complement):
+        _region_surfaces(region.node, surfaces)
+    else:
+        for node in region:
+            _region_surfaces(node, surfaces)
+
+
+def format_complexity_report(report):
+    """
+    Format a report from ToroidalModel.get_complexity_report as a table
+
+    Arguments:
+        report (dict): report to format
+
+    Returns:
+        table (str): formatted report
+    """
+    lines = [
+        f"surfaces: {report['num_surfaces']}, cells: {report['num_cells']}, "
+        f"mean find time: {report['mean_find_time'] * 1e6:.1f} us "
+        f"({report['num_samples']} samples)",
+        f"{'cell':<30}{'operators':>10}{'depth':>7}{'surfaces':>10}"
+        f"{'samples':>9}{'find (us)':>11}",
+    ]
+    for name, cell in report["cells"].items():
+        lines.append(
+            f"{name:<30}{cell['operators']:>10}{cell['depth']:>7}"
+            f"{cell['surfaces']:>10}{cell['sample_fraction']:>9.1%}"
+            f"{cell['mean_find_time'] * 1e6:>11.1f}"
+        )
+
+    return "\n".join(lines)
+
+
+def _periodic_bounds(samples, period):
+    """
+    Boundaries of the angular range covered by each sample of a periodic
+    angle grid, halfway between neighbouring samples.
+
+    Arguments:
+        samples (numpy array): increasing angles within one period
+        period (float): period of the grid
+
+    Returns:
+        bounds (numpy array): sample i covers bounds[i] to bounds[i + 1]
+    """
+    first = (samples[-1] - period + samples[0]) / 2
+
+    return np.concatenate(
+        [[first], (samples[:-1] + samples[1:]) / 2, [first + period]]
+    )
+
+
+def _merge_runs(values, tolerance):
+    """
+    Group consecutive entries of values into runs whose elements all differ
+    by no more than tolerance.
+
+    Arguments:
+        values (numpy array): array to group along its first axis
+        tolerance (float): maximum spread of any element within a run
+
+    Returns:
+        runs (list of tuple): (start, stop) indices of each run
+    """
+    runs = []
+    start = 0
+    low = high = values[0]
+    for index in range(1, len(values)):
+        low = np.minimum(low, values[index])
+        high = np.maximum(high, values[index])
+        if np.max(high - low) > tolerance:
+            runs.append((start, index))
+            start = index
+            low = high = values[index]
+    runs.append((start, len(values)))
+
+    return runs
+
+
+def _toroidal_half_spaces(phi):
+    """
+    Half-spaces on either side of the plane containing the z axis at
+    toroidal angle phi.
+
+    Arguments:
+        phi (float): toroidal angle, in degrees
+
+    Returns:
+        left (OpenMC region): points at larger toroidal angles
+        right (OpenMC region): points at smaller toroidal angles
+    """
+    phi = np.radians(phi)
+    plane = openmc.Plane(a=-np.sin(phi), b=np.cos(phi), c=0.0, d=0.0)
+
+    return +plane, -plane
+
+
+def _poloidal_half_spaces(theta, major_rad):
+    """
+    Regions on either side of the surface swept by the line through the
+    plasma center (major_rad, 0) at poloidal angle theta in the r-z plane.
+    The surface is a z-plane, a z-cylinder, or a cone whose apex is on the
+    z axis, in which case a z-plane through the apex selects the nappe
+    containing the line.
+
+    Arguments:
+        theta (float): poloidal angle, in degrees, measured from the
+            outboard midplane towards +z
+        major_rad (float): major radius of the torus
+
+    Returns:
+        left (OpenMC region): points at larger poloidal angles
+        right (OpenMC region): points at smaller poloidal angles
+    """
+    theta = np.radians(theta)
+    sin_theta, cos_theta = np.sin(theta), np.cos(theta)
+
+    if np.isclose(cos_theta, 0.0):
+        cylinder = openmc.ZCylinder(r=major_rad)
+        if sin_theta > 0:
+            return -cylinder, +cylinder
+        return +cylinder, -cylinder
+
+    if np.isclose(sin_theta, 0.0):
+        plane = openmc.ZPlane(z0=0.0)
+        above, below = +plane, -plane
+    else:
+        slope = sin_theta / cos_theta
+        apex = -major_rad * slope
+        cone = openmc.ZCone(z0=apex, r2=1 / slope**2)
+        apex_plane = openmc.ZPlane(z0=apex)
+        if slope > 0:
+            above = -cone & +apex_plane
+            below = +cone | -apex_plane
+        else:
+            above = +cone | +apex_plane
+            below = -cone & -apex_plane
+
+    if cos_theta > 0:
+        return above, below
+    return below, above
+
+
+def _bounding_sphere_radius(major_rad, minor_rad_z, minor_rad_xy):
+    """
+    Radius of the smallest sphere centered on the origin that contains a
+    ZTorus. Points on the torus are at
+    ((major_rad + minor_rad_xy * u)**2 + minor_rad_z**2 * (1 - u**2))**0.5
+    from the origin for u in [-1, 1], which is largest at u = 1 unless the
+    torus is taller than it is wide.
+    """
+    u = 1.0
+    if minor_rad_z > minor_rad_xy:
+        u = min(
+            major_rad * minor_rad_xy / (minor_rad_z**2 - minor_rad_xy**2), 1.0
+        )
+
+    return (
+        (major_rad + minor_rad_xy * u) ** 2 + minor_rad_z**2 * (1 - u**2)
+    ) ** 0.5
+
+
+def parameter_grid(grid):
+    """
+    Generate every combination of parameter values in a grid, for use with
+    ToroidalModel.sweep
+
+    Arguments:
+        grid (dict): parameter name (str) mapped to an iterable of values
+
+    Yields:
+        params (dict): parameter name (str) mapped to one value
+    """
+    names = list(grid.keys())
+    for values in itertools.product(*grid.values()):
+        yield dict(zip(names, values))
+
+
+def _export_sweep_chunk(model_args, model_kwargs, chunk, export_dir):
+    """
+    Build a ToroidalModel and export a chunk of its sweep variants, for use
+    by workers. The model assigns its own IDs when it is built, see
+    ToroidalModel.assign_ids, so every worker writes the same cell, surface
+    and material IDs.
+
+    Returns:
+        timings (list of tuple): (variant index, model.xml path, seconds)
+    """
+    toroidal_model = ToroidalModel(*model_args, **model_kwargs)
+
+    timings = []
+    variants = toroidal_model.sweep([params for _, params in chunk])
+    start = time.perf_counter()
+    for (index, _), (_, model, _) in zip(chunk, variants):
+        variant_dir = os.path.join(export_dir, str(index))
+        os.makedirs(variant_dir, exist_ok=True)
+        path = os.path.join(variant_dir, "model.xml")
+        model.export_to_model_xml(path)
+
+        end = time.perf_counter()
+        timings.append((index, path, end - start))
+        start = end
+
+    return timings
+
+
+def export_sweep(
+    build,
+    major_rad,
+    minor_rad_z,
+    minor_rad_xy,
+    materials,
+    overrides,
+    export_dir,
+    model_kwargs=None,
+    workers=None,
+    chunk_size=None,
+    verbose=True,
+):
+    """
+    Export variants of a toroidal model to export_dir/<variant index>/model.xml
+    using a pool of worker processes. Each worker builds the model once and
+    exports its share of the variants with ToroidalModel.sweep. Cell,
+    surface and material IDs are the same in every exported model, so
+    repeated runs write identical files.
+
+    Arguments:
+        build, major_rad, minor_rad_z, minor_rad_xy, materials: ToroidalModel
+            arguments for the base model. materials should be a path to a
+            materials xml file, or a picklable OpenMC Materials object.
+        overrides (iter of dict): parameter overrides for each variant, see
+            ToroidalModel.sweep
+        export_dir (str): directory to export the variants to
+        model_kwargs (dict): Optional, keyword arguments for ToroidalModel
+        workers (int): Optional, number of worker processes. If None, the
+            number of processors on the machine is used. If 1, variants are
+            exported in the current process.
+        chunk_size (int): Optional, number of variants exported by a worker
+            at a time
+        verbose (bool): if True, print progress and a timing summary
+
+    Returns:
+        timings (list of tuple): (variant index, model.xml path, seconds) for
+            each variant, ordered by variant index
+    """
+    model_args = (build, major_rad, minor_rad_z, minor_rad_xy, materials)
+    if model_kwargs is None:
+        model_kwargs = {}
+    variants = list(enumerate(overrides))
+    if workers is None:
+        workers = os.cpu_count()
+    if chunk_size is None:
+        chunk_size = max(1, -(-len(variants) // (4 * workers)))
+    chunks = [
+        variants[start : start + chunk_size]
+        for start in range(0, len(variants), chunk_size)
+    ]
+
+    start = time.perf_counter()
+    timings = []
+
+    def record(chunk_timings):
+        timings.extend(chunk_timings)
+        if verbose:
+            print(f"exported {len(timings)}/{len(variants)} variants")
+
+    if workers == 1:
+        for chunk in chunks:
+            record(
+                _export_sweep_chunk(
+                    model_args, model_kwargs, chunk, export_dir
+                )
+            )
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _export_sweep_chunk,
+                    model_args,
+                    model_kwargs,
+                    chunk,
+                    export_dir,
+                )
+                for chunk in chunks
+            ]
+            for future in as_completed(futures):
+                record(future.result())
+
+    elapsed = time.perf_counter() - start
+    timings.sort()
+
+    if verbose and timings:
+        variant_times = [seconds for _, _, seconds in timings]
+        print(
+            f"exported {len(timings)} variants to {export_dir} in "
+            f"{elapsed:.2f} s with {workers} workers, per variant: "
+            f"mean {np.mean(variant_times):.3f} s, "
+            f"max {np.max(variant_times):.3f} s"
+        )
+
+    return timings
+
+
+# material libraries read from xml, keyed on (path, modification time)
+_material_library_cache = {}
+
+
+def index_materials(materials):
+    """
+    Build an index of a material library by material name. OpenMC allows
+    duplicate names, and names are not required, so unnamed materials are
+    left out of the index and duplicate names are rejected.
+
+    Arguments:
+        materials (OpenMC Materials Object): material library to index
+
+    Returns:
+        material_index (dict): material name (str) mapped to the OpenMC
+            material object with that name
+    """
+    material_index = {}
+    for mat in materials:
+        if not mat.name:
+            continue
+        if mat.name in material_index:
+            raise ValueError(
+                f"material name {mat.name} appears more than once in the "
+                "library"
+            )
+        material_index[mat.name] = mat
+
+    return material_index
+
+
+def load_material_library(filename):
+    """
+    Read an OpenMC materials xml file and index it by material name. Results
+    are cached on the file path and modification time, so models using the
+    same file share one material library until the file changes.
+
+    Arguments:
+        filename (str): path to the OpenMC materials xml file
+
+    Returns:
+        materials (OpenMC Materials Object): material library in the file
+        material_index (dict): material name (str) mapped to the OpenMC
+            material object with that name
+    """
+    path = os.path.abspath(filename)
+    key = (path, os.stat(path).st_mtime_ns)
+    if key not in _material_library_cache:
+        # drop libraries read from earlier versions of the file
+        for stale_key in [k for k in _material_library_cache if k[0] == path]:
+            del _material_library_cache[stale_key]
+        materials = openmc.Materials.from_xml(path)
+        _material_library_cache[key] = (materials, index_materials(materials))
+
+    return _material_library_cache[key]
@@ -0,0 +1,166 @@
+import numpy as np
+import pytest
+
+from radial_build_tools import RadialBuild
+from radial_build_tools.build import _torus_volume
+
+MAJOR_RAD = 800.0
+BUILD = {
+    "sol": {"thickness": 5},
+    "first_wall": {"thickness": 4, "material_name": "W"},
+    "gap": {"thickness": 0},
+    "shield": {"thickness": 20, "material_name": "W"},
+    "vacuum_vessel": {"thickness": 10},
+}
+# plasma surfaces taller than wide, wider than tall, and circular
+PLASMA_RADII = [(300.0, 100.0), (100.0, 300.0), (200.0, 200.0)]
+
+
+def sample_points(num_points, minor_rad_z, minor_rad_xy, seed=0):
+    """
+    Sample points uniformly in a box around the build, with a margin so some
+    points are outside of it.
+    """
+    rng = np.random.default_rng(seed)
+    extent = MAJOR_RAD + minor_rad_xy + 60.0
+    height = minor_rad_z + 60.0
+
+    return rng.uniform(
+        (-extent, -extent, -height), (extent, extent, height), (num_points, 3)
+    )
+
+
+@pytest.mark.parametrize("minor_rad_z, minor_rad_xy", PLASMA_RADII)
+def test_classify_points_matches_torus_inequality(minor_rad_z, minor_rad_xy):
+    build = RadialBuild.from_dict(BUILD)
+    points = sample_points(200_000, minor_rad_z, minor_rad_xy)
+
+    radial = np.hypot(points[:, 0], points[:, 1]) - MAJOR_RAD
+    expected = np.full(len(points), len(build))
+    # overwrite from the outermost torus in, so each point keeps the
+    # innermost torus containing it
+    shells = [(-1, 0.0)] + [
+        (index, build.radii[index]) for index in np.flatnonzero(build.nonzero)
+    ]
+    for index, radius in reversed(shells):
+        inside = (points[:, 2] / (minor_rad_z + radius)) ** 2 + (
+            radial / (minor_rad_xy + radius)
+        ) ** 2 < 1
+        expected[inside] = index
+
+    layer_indices = build.classify_points(
+        points, MAJOR_RAD, minor_rad_z, minor_rad_xy
+    )
+
+    np.testing.assert_array_equal(layer_indices, expected)
+    # every region is sampled, and the zero thickness layer never is
+    assert set(np.unique(layer_indices)) == {-1, 0, 1, 3, 4, 5}
+
+
+@pytest.mark.parametrize("minor_rad_z, minor_rad_xy", PLASMA_RADII)
+def test_classify_points_matches_geometry_find(minor_rad_z, minor_rad_xy):
+    openmc = pytest.importorskip("openmc")
+    from radial_build_tools import ToroidalModel
+
+    tungsten = openmc.Material(name="W")
+    tungsten.set_density("g/cm3", 19.3)
+    toroidal_model = ToroidalModel(
+        BUILD,
+        MAJOR_RAD,
+        minor_rad_z,
+        minor_rad_xy,
+        openmc.Materials([tungsten]),
+    )
+    model, _ = toroidal_model.get_openmc_model()
+    points = sample_points(2000, minor_rad_z, minor_rad_xy, seed=1)
+
+    layer_indices = toroidal_model.classify_points(points)
+
+    names = ["plasma_cell"] + list(toroidal_model.build.names)
+    for point, index in zip(points, layer_indices.tolist()):
+        path = model.geometry.find(point)
+        found = path[-1].name if path else None
+        if index == len(toroidal_model.build):
+            # outside the build, in the vacuum cell or the bounding surface
+            assert found in ("vac_cell", None)
+        else:
+            assert found == names[index + 1]
+
+
+def quadrature_volume(minor_rad_z, minor_rad_xy, theta_range=None):
+    """
+    Volume inside a ZTorus around MAJOR_RAD, summing r dr dz over a grid of
+    the part of its cross section at r >= 0, times 2 pi.
+    """
+    num_cells = 2000
+    r_edges = np.linspace(
+        max(MAJOR_RAD - minor_rad_xy, 0.0),
+        MAJOR_RAD + minor_rad_xy,
+        num_cells + 1,
+    )
+    z_edges = np.linspace(-minor_rad_z, minor_rad_z, num_cells + 1)
+    r = (r_edges[:-1] + r_edges[1:])[:, np.newaxis] / 2
+    z = (z_edges[:-1] + z_edges[1:])[np.newaxis, :] / 2
+    inside = ((r - MAJOR_RAD) / minor_rad_xy) ** 2 + (z / minor_rad_z) ** 2 < 1
+    if theta_range is not None:
+        start, stop = theta_range
+        theta = np.degrees(np.arctan2(z, r - MAJOR_RAD))
+        inside &= (theta - start) % 360 < stop - start
+    cell_area = np.diff(r_edges)[0] * np.diff(z_edges)[0]
+
+    return 2 * np.pi * np.sum(r * inside) * cell_area
+
+
+def test_get_volumes_matches_quadrature():
+    minor_rad_z, minor_rad_xy = 300.0, 100.0
+    build = RadialBuild.from_dict(BUILD)
+
+    volumes = build.get_volumes(MAJOR_RAD, minor_rad_z, minor_rad_xy)
+
+    expected = np.diff(
+        [quadrature_volume(minor_rad_z, minor_rad_xy)]
+        + [
+            quadrature_volume(minor_rad_z + radius, minor_rad_xy + radius)
+            for radius in build.radii
+        ]
+    )
+    np.testing.assert_allclose(volumes, expected, rtol=1e-3, atol=1e3)
+    assert volumes[2] == 0
+
+
+def test_get_volumes_of_build_reaching_the_axis():
+    minor_rad_z, minor_rad_xy = 300.0, 100.0
+    build = RadialBuild.from_dict(
+        {"blanket": {"thickness": 500}, "shield": {"thickness": 1500}}
+    )
+
+    volumes = build.get_volumes(MAJOR_RAD, minor_rad_z, minor_rad_xy)
+
+    # the shield's outer torus crosses the z axis
+    assert minor_rad_xy + build.radii[-1] > MAJOR_RAD
+    expected = np.diff(
+        [quadrature_volume(minor_rad_z, minor_rad_xy)]
+        + [
+            quadrature_volume(minor_rad_z + radius, minor_rad_xy + radius)
+            for radius in build.radii
+        ]
+    )
+    np.testing.assert_allclose(volumes, expected, rtol=1e-3)
+
+
+@pytest.mark.parametrize(
+    "theta_range", [(0.0, 45.0), (-30.0, 60.0), (90.0, 270.0), (100.0, 350.0)]
+)
+def test_wedge_volumes_match_quadrature(theta_range):
+    minor_rad_z, minor_rad_xy = 300.0, 100.0
+
+    volume = _torus_volume(
+        MAJOR_RAD, minor_rad_z, minor_rad_xy, theta_range, phi_span=90.0
+    )
+
+    expected = quadrature_volume(minor_rad_z, minor_rad_xy, theta_range) / 4
+    np.testing.assert_allclose(volume, expected, rtol=2e-3)
+
+
+def test_wedge_volumes_of_tori_reaching_the_axis_are_nan():
+    assert np.isnan(_torus_volume(MAJOR_RAD, 300.0, 900.0, (0.0, 90.0)))
@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+PACKAGE_DIR = os.path.join(os.path.dirname(__file__), "..")
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "import radial_build_tools.cli",
+        "from radial_build_tools import RadialBuild, RadialBuildPlot, "
+        "read_yaml",
+        "from radial_build_tools import *",
+    ],
+)
+def test_plotting_path_does_not_import_openmc(statement):
+    script = f"import sys\n{statement}\nprint('openmc' in sys.modules)\n"
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=PACKAGE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    assert output.strip() == "False"
+
+
+def test_star_import_leaves_out_openmc_names():
+    import radial_build_tools
+
+    assert "ToroidalModel" not in radial_build_tools.__all__
+    assert "RadialBuildPlot" in radial_build_tools.__all__
+    assert "ToroidalModel" in dir(radial_build_tools)
@@ -0,0 +1,224 @@
+import numpy as np
+import pytest
+
+from radial_build_tools import (
+    read_parastell_build,
+    sample_parastell_build,
+    write_parastell_build,
+)
+
+PHI_LIST = np.linspace(0.0, 90.0, 5)
+THETA_LIST = np.linspace(0.0, 360.0, 9)
+
+
+def make_parastell_build():
+    phi, theta = np.meshgrid(PHI_LIST, THETA_LIST, indexing="ij")
+
+    return {
+        "phi_list": PHI_LIST,
+        "theta_list": THETA_LIST,
+        "radial_build": {
+            "first_wall": {
+                "thickness_matrix": 4 + np.cos(np.radians(theta)),
+                "h5m_tag": "W",
+            },
+            "breeder": {
+                "thickness_matrix": 30 + phi / 10 + theta / 100,
+                "h5m_tag": "PbLi",
+            },
+            "shield": {
+                "thickness_matrix": np.full(phi.shape, 20.0),
+                "h5m_tag": "SS316L",
+            },
+        },
+    }
+
+
+def write_compressed(parastell_build_dict, filename):
+    """Write a parastell build to a compressed .npz file"""
+    arrays = {
+        "phi_list": parastell_build_dict["phi_list"],
+        "theta_list": parastell_build_dict["theta_list"],
+    }
+    for name, layer in parastell_build_dict["radial_build"].items():
+        arrays[f"radial_build/{name}/thickness_matrix"] = layer[
+            "thickness_matrix"
+        ]
+        arrays[f"radial_build/{name}/h5m_tag"] = layer["h5m_tag"]
+    np.savez_compressed(filename, **arrays)
+
+
+@pytest.mark.parametrize(
+    "suffix, mmap_mode, compressed",
+    [
+        (".npz", "r", False),
+        (".npz", None, False),
+        (".npz", "r", True),
+        (".h5", None, False),
+    ],
+)
+def test_read_parastell_build_round_trip(
+    suffix, mmap_mode, compressed, tmp_path
+):
+    if suffix == ".h5":
+        pytest.importorskip("h5py")
+    parastell_build = make_parastell_build()
+    filename = str(tmp_path / f"build{suffix}")
+    if compressed:
+        write_compressed(parastell_build, filename)
+    else:
+        write_parastell_build(parastell_build, filename)
+
+    read_build = read_parastell_build(filename, mmap_mode=mmap_mode)
+
+    # uncompressed matrices are mapped at offsets read from the zip headers
+    memmapped = suffix == ".npz" and mmap_mode is not None and not compressed
+    for layer in read_build["radial_build"].values():
+        assert isinstance(layer["thickness_matrix"], np.memmap) == memmapped
+    np.testing.assert_array_equal(read_build["phi_list"], PHI_LIST)
+    np.testing.assert_array_equal(read_build["theta_list"], THETA_LIST)
+    phi = np.array([[0.0], [12.0], [45.0], [90.0]])
+    theta = np.array([0.0, 100.0, 222.5, 360.0])
+    for interpolate in (False, True):
+        expected = sample_parastell_build(
+            parastell_build, phi, theta, interpolate=interpolate
+        )
+        names, tags, thicknesses = sample_parastell_build(
+            read_build, phi, theta, interpolate=interpolate
+        )
+        assert names == expected[0]
+        assert tags == expected[1]
+        np.testing.assert_array_equal(thicknesses, expected[2])
+    # whole matrices and slices read back unchanged
+    for name, layer in parastell_build["radial_build"].items():
+        matrix = read_build["radial_build"][name]["thickness_matrix"]
+        np.testing.assert_array_equal(
+            np.asarray(matrix), layer["thickness_matrix"]
+        )
+        np.testing.assert_array_equal(
+            matrix[1:3, 2:], layer["thickness_matrix"][1:3, 2:]
+        )
+
+
+@pytest.mark.parametrize("suffix", [".npz", ".h5"])
+def test_write_parastell_build_rejects_slashes(suffix, tmp_path):
+    parastell_build = make_parastell_build()
+    radial_build = parastell_build["radial_build"]
+    radial_build["inboard/outboard"] = radial_build.pop("shield")
+
+    with pytest.raises(ValueError, match="inboard/outboard"):
+        write_parastell_build(parastell_build, str(tmp_path / f"b{suffix}"))
+
+
+def test_read_parastell_build_with_slashes_in_layer_names(tmp_path):
+    parastell_build = make_parastell_build()
+    radial_build = parastell_build["radial_build"]
+    radial_build["inboard/outboard"] = radial_build.pop("shield")
+    filename = str(tmp_path / "build.npz")
+    write_compressed(parastell_build, filename)
+
+    read_build = read_parastell_build(filename)
+
+    assert list(read_build["radial_build"]) == list(radial_build)
+    np.testing.assert_array_equal(
+        np.asarray(
+            read_build["radial_build"]["inboard/outboard"]["thickness_matrix"]
+        ),
+        radial_build["inboard/outboard"]["thickness_matrix"],
+    )
+
+
+def matrix_values(parastell_build_dict, phi_index, theta_index):
+    """Thickness of every layer at the given grid indices"""
+    return np.array(
+        [
+            layer["thickness_matrix"][phi_index, theta_index]
+            for layer in parastell_build_dict["radial_build"].values()
+        ]
+    )
+
+
+def test_sample_parastell_build_at_grid_angles():
+    parastell_build = make_parastell_build()
+    phi_index, theta_index = np.meshgrid(
+        np.arange(len(PHI_LIST)), np.arange(len(THETA_LIST)), indexing="ij"
+    )
+    expected = matrix_values(parastell_build, phi_index, theta_index)
+
+    for interpolate in (False, True):
+        names, tags, thicknesses = sample_parastell_build(
+            parastell_build,
+            PHI_LIST[:, np.newaxis],
+            THETA_LIST,
+            interpolate=interpolate,
+        )
+
+        assert names == ["first_wall", "breeder", "shield"]
+        assert tags == ["W", "PbLi", "SS316L"]
+        np.testing.assert_array_equal(thicknesses, expected)
+
+
+def test_sample_parastell_build_off_grid():
+    parastell_build = make_parastell_build()
+    # a quarter of the way from (22.5, 90) to (45, 135)
+    phi, theta = 28.125, 101.25
+
+    _, _, nearest = sample_parastell_build(parastell_build, phi, theta)
+    _, _, interpolated = sample_parastell_build(
+        parastell_build, phi, theta, interpolate=True
+    )
+
+    np.testing.assert_array_equal(
+        nearest, matrix_values(parastell_build, 1, 2)
+    )
+    corners = [
+        matrix_values(parastell_build, i, j) for i in (1, 2) for j in (2, 3)
+    ]
+    weights = [0.75 * 0.75, 0.75 * 0.25, 0.25 * 0.75, 0.25 * 0.25]
+    np.testing.assert_allclose(
+        interpolated, sum(w * c for w, c in zip(weights, corners))
+    )
+    # the breeder thickness is linear in both angles
+    assert interpolated[1] == pytest.approx(30 + phi / 10 + theta / 100)
+
+
+def test_sample_parastell_build_midpoint_ties_go_to_lower_grid_point():
+    parastell_build = make_parastell_build()
+
+    _, _, thicknesses = sample_parastell_build(
+        parastell_build, [33.75, 33.76], [22.5, 22.6]
+    )
+
+    np.testing.assert_array_equal(
+        thicknesses,
+        matrix_values(parastell_build, np.array([1, 2]), np.array([0, 1])),
+    )
+
+
+def test_sample_parastell_build_broadcasts_angles():
+    parastell_build = make_parastell_build()
+    phi = np.array([[10.0], [50.0], [80.0]])
+    theta = np.array([30.0, 100.0, 200.0, 300.0])
+
+    for interpolate in (False, True):
+        _, _, thicknesses = sample_parastell_build(
+            parastell_build, phi, theta, interpolate=interpolate
+        )
+
+        assert thicknesses.shape == (3, 3, 4)
+        for i, j in np.ndindex(3, 4):
+            _, _, expected = sample_parastell_build(
+                parastell_build, phi[i, 0], theta[j], interpolate=interpolate
+            )
+            np.testing.assert_array_equal(thicknesses[:, i, j], expected)
+
+    _, _, scalar = sample_parastell_build(parastell_build, 10.0, 30.0)
+    assert scalar.shape == (3,)
+
+
+@pytest.mark.parametrize(
+    "phi, theta", [(-1.0, 0.0), (90.5, 0.0), (0.0, 361.0), ([0, 95], 0.0)]
+)
+def test_sample_parastell_build_out_of_range(phi, theta):
+    with pytest.raises(ValueError, match="within the grid range"):
+        sample_parastell_build(make_parastell_build(), phi, theta)
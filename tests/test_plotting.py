@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from radial_build_tools import RadialBuildPlot, clear_layer_string_cache
+
+
+def layer_text(composition):
+    layer = {"thickness": 4, "composition": composition}
+    radial_build = RadialBuildPlot({"first_wall": layer})
+
+    return radial_build.get_layer_string("first_wall", layer)[0]
+
+
+def composition_text(composition):
+    return RadialBuildPlot({}).build_composition_string(composition)
+
+
+@pytest.mark.parametrize("get_text", [layer_text, composition_text])
+def test_text_does_not_depend_on_cache_history(get_text):
+    clear_layer_string_cache()
+    float_text = get_text({"W": 1.0})
+    clear_layer_string_cache()
+    int_text = get_text({"W": 1})
+    assert float_text != int_text
+
+    clear_layer_string_cache()
+    get_text({"W": 1})
+    assert get_text({"W": 1.0}) == float_text
+
+    clear_layer_string_cache()
+    get_text({"W": 1.0})
+    assert get_text({"W": 1}) == int_text
+
+
+def test_parastell_sweep_matches_single_angles():
+    phi_list = np.linspace(0, 90, 4)
+    theta_list = np.linspace(0, 360, 5)
+    phi, theta = np.meshgrid(phi_list, theta_list, indexing="ij")
+    parastell_build = {
+        "phi_list": phi_list,
+        "theta_list": theta_list,
+        "radial_build": {
+            f"layer_{i}": {
+                "thickness_matrix": 5 + np.sin(np.radians(theta + 10 * i)),
+                "h5m_tag": f"tag_{i}",
+            }
+            for i in range(3)
+        },
+    }
+
+    plots = list(RadialBuildPlot.from_parastell_sweep(parastell_build))
+
+    assert len(plots) == phi.size
+    # thicknesses of every angle are views into one stacked array
+    bases = {id(plot._build.thicknesses.base) for _, _, plot in plots}
+    assert len(bases) == 1
+    for angle_phi, angle_theta, plot in plots:
+        expected = RadialBuildPlot.from_parastell_build(
+            parastell_build, angle_phi, angle_theta
+        )
+        assert plot.build == expected.build
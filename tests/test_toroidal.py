@@ -0,0 +1,318 @@
+import os
+
+import numpy as np
+import pytest
+
+openmc = pytest.importorskip("openmc")
+
+from radial_build_tools import (  # noqa: E402
+    RadialBuild,
+    ToroidalModel,
+    export_sweep,
+    parameter_grid,
+)
+
+BUILD = {
+    "sol": {"thickness": 5},
+    "first_wall": {"thickness": 4, "material_name": "W"},
+    "gap": {"thickness": 0},
+    "shield": {"thickness": 20, "material_name": "SS316L"},
+    "vacuum_vessel": {"thickness": 10, "material_name": "SS316L"},
+}
+
+
+def write_library(filename):
+    tungsten = openmc.Material(name="W")
+    tungsten.add_element("W", 1.0)
+    tungsten.set_density("g/cm3", 19.3)
+    steel = openmc.Material(name="SS316L")
+    steel.add_element("Fe", 1.0)
+    steel.set_density("g/cm3", 8.0)
+    openmc.Materials([tungsten, steel]).export_to_xml(filename)
+
+
+def read_exports(export_dir):
+    exports = {}
+    for root, _, files in os.walk(export_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            with open(path, "rb") as file:
+                exports[os.path.relpath(path, export_dir)] = file.read()
+
+    return exports
+
+
+def test_export_sweep_writes_identical_xml(tmp_path):
+    library = str(tmp_path / "materials.xml")
+    write_library(library)
+    overrides = list(
+        parameter_grid({"shield": [10.0, 20.0], "minor_rad_z": [300.0, 310.0]})
+    )
+
+    exports = []
+    # in process one variant at a time, in workers, and in one chunk
+    for run, (workers, chunk_size) in enumerate([(1, 1), (2, 1), (1, 4)]):
+        # objects made by the caller must not change the exported IDs
+        openmc.Cell()
+        openmc.Sphere()
+        openmc.Material()
+        export_dir = str(tmp_path / str(run))
+        export_sweep(
+            BUILD,
+            800.0,
+            300.0,
+            100.0,
+            library,
+            overrides,
+            export_dir,
+            workers=workers,
+            chunk_size=chunk_size,
+            verbose=False,
+        )
+        exports.append(read_exports(export_dir))
+
+    assert len(exports[0]) == len(overrides)
+    assert exports[0] == exports[1] == exports[2]
+
+
+def test_export_sweep_leaves_auto_ids(tmp_path):
+    library = str(tmp_path / "materials.xml")
+    write_library(library)
+    cell = openmc.Cell()
+
+    export_sweep(
+        BUILD,
+        800.0,
+        300.0,
+        100.0,
+        library,
+        [{}],
+        str(tmp_path / "sweep"),
+        workers=1,
+        verbose=False,
+    )
+
+    assert openmc.Cell().id != cell.id
+
+
+def test_models_sharing_a_library_keep_their_volumes(tmp_path):
+    library = str(tmp_path / "materials.xml")
+    write_library(library)
+    small = ToroidalModel(BUILD, 800.0, 300.0, 100.0, library)
+    small_model, small_cells = small.get_openmc_model()
+    small_volume = small_cells["shield"].fill.volume
+
+    large = ToroidalModel(
+        dict(BUILD, shield={"thickness": 40, "material_name": "SS316L"}),
+        800.0,
+        300.0,
+        100.0,
+        library,
+    )
+    _, large_cells = large.get_openmc_model()
+
+    assert large_cells["shield"].fill.volume > small_volume
+    assert small_cells["shield"].fill.volume == small_volume
+    # clones of library materials keep their library IDs
+    assert [material.id for material in small_model.materials] == [
+        material.id for material in small.input_materials
+    ]
+
+
+def test_compositions_are_void_unless_mixed(tmp_path):
+    library = str(tmp_path / "materials.xml")
+    write_library(library)
+    build = {
+        "first_wall": {"thickness": 4, "composition": {"W": 0.5, "Void": 0.5}},
+        "blanket": {"thickness": 30, "composition": {"MF82H": 1.0}},
+        "back_wall": {"thickness": 4, "composition": {"Void": 0.5, "W": 0.5}},
+    }
+
+    void_model = ToroidalModel(build, 800.0, 300.0, 100.0, library)
+    assert void_model.layer_materials == [None, None, None]
+
+    del build["blanket"]
+    mixed_model = ToroidalModel(
+        build, 800.0, 300.0, 100.0, library, mix_compositions=True
+    )
+    first_wall, back_wall = mixed_model.layer_materials
+    assert first_wall is not None
+    assert first_wall is back_wall
+
+
+def test_build_reaching_the_axis_sets_volumes(tmp_path):
+    library = str(tmp_path / "materials.xml")
+    write_library(library)
+    build = dict(BUILD, shield={"thickness": 2000, "material_name": "W"})
+    toroidal_model = ToroidalModel(build, 800.0, 300.0, 100.0, library)
+
+    _, cells = toroidal_model.get_openmc_model()
+
+    volumes = toroidal_model.build.get_volumes(800.0, 300.0, 100.0)
+    for name, volume in zip(toroidal_model.build.names, volumes):
+        if volume:
+            assert cells[name].volume == pytest.approx(volume)
+
+
+def make_sector_builds():
+    """
+    Parastell builds partitioned into sectors: one with a phi grid repeated
+    four times around the torus, and one spanning the whole torus with a
+    sector covering 270 degrees of phi and theta sectors bounded by planes
+    and cylinders.
+    """
+    phi_list = np.linspace(0, 90, 7)
+    theta_list = np.linspace(0, 360, 9)
+    phi, theta = np.meshgrid(phi_list, theta_list, indexing="ij")
+    first_wall = 10 + 5 * np.round(np.cos(np.radians(theta)))
+    shield = 4 + 2 * np.round(np.sin(np.radians(4 * phi)))
+    # the last phi grid point repeats the first
+    shield[-1] = shield[0]
+    periodic = (phi_list, theta_list, first_wall, shield)
+
+    phi_list = np.array([0.0, 90.0, 180.0, 270.0, 360.0])
+    theta_list = np.array([45.0, 135.0, 225.0, 315.0])
+    first_wall = np.tile([10.0, 12.0, 14.0, 12.0], (5, 1))
+    shield = np.full((5, 4), 4.0)
+    shield[[0, -1]] = 8.0
+    whole = (phi_list, theta_list, first_wall, shield)
+
+    return [
+        {
+            "phi_list": phi_list,
+            "theta_list": theta_list,
+            "radial_build": {
+                "first_wall": {"thickness_matrix": first_wall, "h5m_tag": "W"},
+                "gap": {
+                    "thickness_matrix": np.zeros_like(first_wall),
+                    "h5m_tag": None,
+                },
+                "shield": {"thickness_matrix": shield, "h5m_tag": "SS316L"},
+            },
+        }
+        for phi_list, theta_list, first_wall, shield in (periodic, whole)
+    ]
+
+
+def nearest_grid_index(angles, grid, period):
+    """
+    Index of the grid point nearest to each angle, and the margin to the
+    boundary with the next nearest grid point, in degrees
+    """
+    distance = np.abs((angles[:, np.newaxis] - grid + period / 2) % period)
+    distance = np.abs(distance - period / 2)
+    nearest = np.sort(distance, axis=1)
+
+    return distance.argmin(axis=1), (nearest[:, 1] - nearest[:, 0]) / 2
+
+
+@pytest.mark.parametrize("build_index", [0, 1])
+def test_sector_cells_match_geometry_find(build_index, tmp_path):
+    library = str(tmp_path / "materials.xml")
+    write_library(library)
+    parastell_build = make_sector_builds()[build_index]
+    major_rad, minor_rad_z, minor_rad_xy = 100.0, 30.0, 20.0
+    toroidal_model = ToroidalModel.from_parastell_build(
+        parastell_build, major_rad, minor_rad_z, minor_rad_xy, library
+    )
+    model, _ = toroidal_model.get_openmc_model()
+
+    phi_list = parastell_build["phi_list"][:-1]
+    phi_period = (
+        parastell_build["phi_list"][-1] - parastell_build["phi_list"][0]
+    )
+    theta_list = parastell_build["theta_list"] % 360
+    if np.isclose(theta_list[-1], theta_list[0]):
+        theta_list = theta_list[:-1]
+    layers = parastell_build["radial_build"]
+
+    rng = np.random.default_rng(0)
+    points = rng.uniform((-160, -160, -60), (160, 160, 60), (3000, 3))
+    r = np.hypot(points[:, 0], points[:, 1])
+    phi = np.degrees(np.arctan2(points[:, 1], points[:, 0]))
+    theta = np.degrees(np.arctan2(points[:, 2], r - major_rad))
+    phi_index, phi_margin = nearest_grid_index(phi, phi_list, phi_period)
+    theta_index, theta_margin = nearest_grid_index(theta, theta_list, 360)
+
+    num_checked = 0
+    for point, i, j, margin in zip(
+        points, phi_index, theta_index, np.minimum(phi_margin, theta_margin)
+    ):
+        # sector boundaries are planes and cones, not the surfaces of
+        # constant angle computed here, so points near them are skipped
+        if margin < 0.5:
+            continue
+        offset_z, offset_xy = minor_rad_z, minor_rad_xy
+        expected = "plasma_cell"
+        for name, layer in [(None, None)] + list(layers.items()):
+            if name is not None:
+                offset_z += layer["thickness_matrix"][i, j]
+                offset_xy += layer["thickness_matrix"][i, j]
+                expected = name
+            if (point[2] / offset_z) ** 2 + (
+                (np.hypot(*point[:2]) - major_rad) / offset_xy
+            ) ** 2 < 1:
+                break
+        else:
+            expected = "outside"
+
+        path = model.geometry.find(point)
+        found = path[-1].name if path else "outside"
+        if expected == "outside":
+            assert found in ("vac_cell", "outside")
+        elif expected == "plasma_cell":
+            assert found == expected
+        else:
+            assert found.rsplit("_", 1)[0] == expected
+        num_checked += 1
+
+    assert num_checked > 1000
+
+
+def test_sector_cell_volumes_add_up(tmp_path):
+    library = str(tmp_path / "materials.xml")
+    write_library(library)
+    parastell_build = make_sector_builds()[0]
+    # the first wall is uniform, but split into the sectors of the shield
+    first_wall = parastell_build["radial_build"]["first_wall"]
+    first_wall["thickness_matrix"] = np.full_like(
+        first_wall["thickness_matrix"], 10.0
+    )
+    toroidal_model = ToroidalModel.from_parastell_build(
+        parastell_build, 100.0, 30.0, 20.0, library
+    )
+    toroidal_model.get_openmc_model()
+
+    cells = toroidal_model.layer_cells["first_wall"]
+    assert len(cells) > 1
+    uniform = RadialBuild.from_dict({"first_wall": {"thickness": 10.0}})
+    expected = uniform.get_volumes(100.0, 30.0, 20.0)[0]
+    assert sum(cell.volume for cell in cells) == pytest.approx(expected)
+
+
+def test_sectorized_build_needs_matching_grid(tmp_path):
+    library = str(tmp_path / "materials.xml")
+    write_library(library)
+    parastell_build = make_sector_builds()[0]
+
+    with pytest.raises(ValueError, match="phi_list and theta_list"):
+        ToroidalModel(
+            {
+                name: {"thickness_matrix": layer["thickness_matrix"]}
+                for name, layer in parastell_build["radial_build"].items()
+            },
+            100.0,
+            30.0,
+            20.0,
+            library,
+        )
+    with pytest.raises(ValueError, match="shape"):
+        ToroidalModel.from_parastell_build(
+            dict(
+                parastell_build, theta_list=parastell_build["theta_list"][1:]
+            ),
+            100.0,
+            30.0,
+            20.0,
+            library,
+        )